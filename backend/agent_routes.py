@@ -1,41 +1,23 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify
 from sqlalchemy.orm.attributes import flag_modified
-import jwt
 import uuid
 from datetime import datetime
+from auth import AuthError, bearer_token
+from app_logging import get_logger
 
 agent_bp = Blueprint('agent_bp', __name__)
+log = get_logger(__name__)
 
 def get_current_user():
     """Helper function to validate token and get current user"""
     try:
-        # Get token from Authorization header
-        token = None
-        auth_header = request.headers.get('Authorization', '')
-        if auth_header.startswith('Bearer '):
-            token = auth_header.split(' ')[1]
+        # Get the shared authenticator from app context (cached token -> user snapshot)
+        from app import authenticator
         
-        if not token:
-            return None, jsonify({'error': 'Token missing'}), 401
-        
-        # Decode token
-        try:
-            data_token = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
-        except jwt.ExpiredSignatureError:
-            return None, jsonify({'error': 'Token expired'}), 401
-        except jwt.InvalidTokenError:
-            return None, jsonify({'error': 'Token invalid'}), 401
-        
-        # Get database and models from app context
-        from app import db, User
-        
-        # ✅ Use db.session.get() instead of User.query.get()
-        user = db.session.get(User, data_token['user_id'])
-        if not user:
-            return None, jsonify({'error': 'User not found'}), 401
-            
-        return user, None, None
+        return authenticator.authenticate(bearer_token(request.headers)), None, None
         
+    except AuthError as e:
+        return None, jsonify({'error': e.message}), e.status
     except Exception as e:
         return None, jsonify({'error': f'Authentication failed: {str(e)}'}), 500
 
@@ -115,7 +97,7 @@ def create_agent_registration():
     except Exception as e:
         from app import db
         db.session.rollback()
-        current_app.logger.error(f"Error creating agent registration: {str(e)}")
+        log.error('agent.create_failed', error=str(e))
         return jsonify({'error': f'Failed to create agent registration: {str(e)}'}), 500
 
 @agent_bp.route('/api/agent-registrations/<quotation_id>/services', methods=['PUT'])
@@ -175,7 +157,7 @@ def update_agent_services(quotation_id):
     except Exception as e:
         from app import db
         db.session.rollback()
-        current_app.logger.error(f"Error updating agent services: {str(e)}")
+        log.error('agent.services_update_failed', id=quotation_id, error=str(e))
         return jsonify({'error': f'Failed to update services: {str(e)}'}), 500
 
 @agent_bp.route('/api/agent-registrations/<quotation_id>/complete', methods=['PUT'])
@@ -214,7 +196,7 @@ def complete_agent_registration(quotation_id):
     except Exception as e:
         from app import db
         db.session.rollback()
-        current_app.logger.error(f"Error completing agent registration: {str(e)}")
+        log.error('agent.complete_failed', id=quotation_id, error=str(e))
         return jsonify({'error': f'Failed to complete registration: {str(e)}'}), 500
 
 @agent_bp.route('/api/agent-registrations', methods=['GET'])
@@ -227,24 +209,31 @@ def get_agent_registrations():
             return error_response, error_code
             
         # Get database and models
-        from app import Quotation
+        from app import Quotation, list_view
+        
+        # Summary rows leave the JSON columns unloaded; ?view=full returns complete registrations
+        try:
+            summary = list_view(request.args) == 'summary'
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        query = Quotation.summary_query() if summary else Quotation.query
         
         # Only admin/manager can see all, users see their own
         if current_user.role in ['admin', 'manager']:
-            quotations = Quotation.query.filter_by(developer_type='agent').order_by(Quotation.created_at.desc()).all()
+            quotations = query.filter_by(developer_type='agent').order_by(Quotation.created_at.desc()).all()
         else:
-            quotations = Quotation.query.filter_by(
+            quotations = query.filter_by(
                 developer_type='agent',
                 created_by=current_user.username
             ).order_by(Quotation.created_at.desc()).all()
         
         return jsonify({
             'success': True,
-            'data': [q.to_dict() for q in quotations]
+            'data': [q.to_summary_dict() if summary else q.to_dict() for q in quotations]
         })
         
     except Exception as e:
-        current_app.logger.error(f"Error fetching agent registrations: {str(e)}")
+        log.error('agent.list_failed', error=str(e))
         return jsonify({'error': f'Failed to fetch agent registrations: {str(e)}'}), 500
 
 @agent_bp.route('/api/agent-registrations/<quotation_id>', methods=['GET'])
@@ -274,7 +263,7 @@ def get_agent_registration(quotation_id):
         })
         
     except Exception as e:
-        current_app.logger.error(f"Error fetching agent registration: {str(e)}")
+        log.error('agent.get_failed', id=quotation_id, error=str(e))
         return jsonify({'error': f'Failed to fetch agent registration: {str(e)}'}), 500
 
 @agent_bp.route('/api/agent-registrations/<quotation_id>', methods=['DELETE'])
@@ -309,7 +298,7 @@ def delete_agent_registration(quotation_id):
     except Exception as e:
         from app import db
         db.session.rollback()
-        current_app.logger.error(f"Error deleting agent registration: {str(e)}")
+        log.error('agent.delete_failed', id=quotation_id, error=str(e))
         return jsonify({'error': f'Failed to delete agent registration: {str(e)}'}), 500
 
 @agent_bp.route('/api/agent-registrations/<quotation_id>/pricing', methods=['PUT'])
@@ -361,5 +350,5 @@ def update_agent_pricing(quotation_id):
     except Exception as e:
         from app import db
         db.session.rollback()
-        current_app.logger.error(f"Error updating agent pricing: {str(e)}")
+        log.error('agent.pricing_update_failed', id=quotation_id, error=str(e))
         return jsonify({'error': f'Failed to update pricing: {str(e)}'}), 500
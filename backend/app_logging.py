@@ -0,0 +1,118 @@
+# app_logging.py - Level-gated structured logging: JSON lines, lazily built fields, sampled debug payloads
+import json
+import logging
+import os
+import random
+from datetime import datetime, timezone
+
+# Share of debug(..., sample=True) events that are emitted when DEBUG is enabled
+_debug_sample_rate = 1.0
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, event plus the event's fields"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'event': record.getMessage(),
+        }
+        entry.update(getattr(record, 'fields', None) or {})
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class KeyValueFormatter(logging.Formatter):
+    """Human readable variant for local development: '<time> LEVEL logger event key=value ...'"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s %(name)s %(message)s')
+
+    def format(self, record):
+        line = super().format(record)
+        fields = getattr(record, 'fields', None)
+        if fields:
+            line += ' ' + ' '.join(f"{key}={json.dumps(value, default=str, ensure_ascii=False)}"
+                                   for key, value in fields.items())
+        return line
+
+
+class EventLogger:
+    """
+    log.info('pdf.generated', id=quotation_id, bytes=size) logs the event
+    'pdf.generated' with those fields.
+
+    Nothing is formatted unless the level is enabled, and field values that
+    are callables (lambda: dict(request.args)) are only called then. Pass
+    payloads as objects, not f-strings - they are serialized by the formatter,
+    i.e. only for records that are actually written. debug(..., sample=True)
+    marks large per-request payloads; only a LOG_DEBUG_SAMPLE_RATE share of
+    those is emitted.
+    """
+
+    def __init__(self, name):
+        self._logger = logging.getLogger(name)
+
+    def is_enabled(self, level):
+        return self._logger.isEnabledFor(level)
+
+    def _log(self, level, event, fields, exc_info=False):
+        fields = {key: value() if callable(value) else value for key, value in fields.items()}
+        self._logger.log(level, event, exc_info=exc_info, extra={'fields': fields}, stacklevel=3)
+
+    def debug(self, event, sample=False, **fields):
+        if not self._logger.isEnabledFor(logging.DEBUG):
+            return
+        if sample and random.random() >= _debug_sample_rate:
+            return
+        self._log(logging.DEBUG, event, fields)
+
+    def info(self, event, **fields):
+        if self._logger.isEnabledFor(logging.INFO):
+            self._log(logging.INFO, event, fields)
+
+    def warning(self, event, **fields):
+        if self._logger.isEnabledFor(logging.WARNING):
+            self._log(logging.WARNING, event, fields)
+
+    def error(self, event, **fields):
+        if self._logger.isEnabledFor(logging.ERROR):
+            self._log(logging.ERROR, event, fields)
+
+    def exception(self, event, **fields):
+        """error() plus the traceback of the exception being handled"""
+        if self._logger.isEnabledFor(logging.ERROR):
+            self._log(logging.ERROR, event, fields, exc_info=True)
+
+
+def get_logger(name):
+    return EventLogger(name)
+
+
+def configure_logging(app=None):
+    """
+    Install the log handler on the root logger from the environment.
+
+    LOG_LEVEL (default INFO), LOG_FORMAT json (default) or text, and
+    LOG_DEBUG_SAMPLE_RATE (default 1.0) for sampled debug payloads. The Flask
+    app logger follows LOG_LEVEL too, instead of Flask's DEBUG-in-debug-mode.
+    """
+    global _debug_sample_rate
+    level = os.environ.get('LOG_LEVEL', 'INFO').upper()
+    _debug_sample_rate = float(os.environ.get('LOG_DEBUG_SAMPLE_RATE', 1.0))
+
+    handler = logging.StreamHandler()
+    if os.environ.get('LOG_FORMAT', 'json').lower() == 'text':
+        handler.setFormatter(KeyValueFormatter())
+    else:
+        handler.setFormatter(JsonLinesFormatter())
+
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level)
+    if app is not None:
+        app.logger.setLevel(level)
+    return level
@@ -0,0 +1,138 @@
+# approval.py - Decides whether a quotation needs manager/admin approval, with the reasons why
+import threading
+from collections import OrderedDict, namedtuple
+
+from services_data import ADDON_PREFIX, services_manager
+
+APPROVAL_PACKAGE_ADDONS = 'package_addons'
+APPROVAL_CUSTOMIZED_HEADER = 'customized_header'
+APPROVAL_CUSTOM_TERMS = 'custom_terms'
+APPROVAL_DISCOUNT = 'discount_over_threshold'
+
+
+class ApprovalReason(namedtuple('ApprovalReason', 'code message header service_ids')):
+    __slots__ = ()
+
+    def to_dict(self):
+        data = {'code': self.code, 'message': self.message}
+        if self.header is not None:
+            data['header'] = self.header
+        if self.service_ids:
+            data['serviceIds'] = list(self.service_ids)
+        return data
+
+
+class ApprovalDecision(namedtuple('ApprovalDecision', 'requires_approval reasons effective_discount')):
+    __slots__ = ()
+
+    def has_reason(self, code):
+        return any(reason.code == code for reason in self.reasons)
+
+    def to_dict(self):
+        return {
+            'requiresApproval': self.requires_approval,
+            'effectiveDiscount': round(self.effective_discount, 2),
+            'reasons': [reason.to_dict() for reason in self.reasons],
+        }
+
+
+def effective_discount(discount_percent, discount_amount, total_amount):
+    """Discount in percent: the explicit percentage, else the amount relative to the undiscounted total"""
+    if discount_percent and discount_percent > 0:
+        return discount_percent
+    if total_amount and discount_amount:
+        return discount_amount / (total_amount + discount_amount) * 100
+    return 0
+
+
+def headers_signature(headers):
+    """
+    The part of headers approval depends on - header names and service ids -
+    as a hashable tuple, built in one pass.
+    """
+    return tuple(
+        (header.get('header') or header.get('name', ''),
+         tuple(service.get('id') or '' for service in header.get('services') or ()))
+        for header in headers or ()
+    )
+
+
+class ApprovalEngine:
+    """
+    Classifies a quotation in one pass over its headers: package headers with
+    add-on services, non-empty customized headers, custom terms and a discount
+    above the acting user's threshold each add a reason.
+
+    Decisions are cached per (headers signature, effective discount, has
+    custom terms, threshold), so re-evaluating many quotations that share a
+    service selection - e.g. after a threshold change - is mostly lookups.
+    """
+
+    def __init__(self, header_type=None, max_size=4096):
+        self._header_type = header_type or services_manager.header_type
+        self.max_size = max_size
+        self._decisions = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def evaluate(self, headers, discount_percent=0, discount_amount=0, total_amount=0,
+                 custom_terms=None, threshold=0):
+        discount = effective_discount(discount_percent, discount_amount, total_amount)
+        key = (headers_signature(headers), discount, bool(custom_terms), threshold)
+
+        with self._lock:
+            decision = self._decisions.get(key)
+            if decision is not None:
+                self._decisions.move_to_end(key)
+                self.hits += 1
+                return decision
+            self.misses += 1
+
+        decision = self._decide(key[0], discount, bool(custom_terms), threshold)
+        with self._lock:
+            self._decisions[key] = decision
+            while len(self._decisions) > self.max_size:
+                self._decisions.popitem(last=False)
+        return decision
+
+    def evaluate_quotation(self, q, threshold):
+        return self.evaluate(q.headers, q.discount_percent, q.discount_amount, q.total_amount,
+                             q.custom_terms, threshold)
+
+    def _decide(self, signature, discount, has_custom_terms, threshold):
+        reasons = []
+        for header_name, service_ids in signature:
+            is_package, is_customized = self._header_type(header_name)
+            if is_package:
+                addons = tuple(service_id for service_id in service_ids if service_id.startswith(ADDON_PREFIX))
+                if addons:
+                    reasons.append(ApprovalReason(
+                        APPROVAL_PACKAGE_ADDONS, f"Package '{header_name}' contains add-on services",
+                        header_name, addons))
+            if is_customized and service_ids:
+                reasons.append(ApprovalReason(
+                    APPROVAL_CUSTOMIZED_HEADER, f"Customized header '{header_name}' has services",
+                    header_name, ()))
+
+        if has_custom_terms:
+            reasons.append(ApprovalReason(APPROVAL_CUSTOM_TERMS, "Custom terms were added", None, ()))
+        if discount > threshold:
+            reasons.append(ApprovalReason(
+                APPROVAL_DISCOUNT, f"Discount {round(discount, 2)}% exceeds the {threshold}% limit", None, ()))
+
+        return ApprovalDecision(bool(reasons), tuple(reasons), discount)
+
+    def clear(self):
+        with self._lock:
+            self._decisions.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._decisions),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': round(self.hits / total, 4) if total else 0.0,
+            }
@@ -0,0 +1,98 @@
+# auth.py - Shared JWT authentication with a short-lived, size-bounded cache of user snapshots
+import threading
+import time
+from collections import OrderedDict, namedtuple
+import jwt
+
+# What request handlers get as current_user: a read-only copy of the User row
+UserSnapshot = namedtuple('UserSnapshot', 'id fname lname username role threshold')
+
+
+class AuthError(Exception):
+    def __init__(self, message, status=401):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def bearer_token(headers):
+    """Token from an 'Authorization: Bearer <token>' header, or None"""
+    parts = headers.get('Authorization', '').split()
+    return parts[1] if len(parts) == 2 else None
+
+
+class Authenticator:
+    """
+    Turns a JWT into a UserSnapshot.
+
+    Verified tokens are cached with their snapshot for at most ttl seconds (and
+    never past the token's own expiry), so repeat requests with the same token
+    skip both the JWT decode and the user query. invalidate_user() drops a
+    user's entries; a snapshot loaded while an invalidation was in flight is
+    not cached.
+    """
+
+    def __init__(self, secret, load_user, ttl=60, max_size=1024):
+        self._secret = secret  # callable returning the signing key
+        self._load_user = load_user  # user_id -> User or None
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()  # token -> (expires_at, snapshot)
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def authenticate(self, token):
+        if not token:
+            raise AuthError('Token missing')
+
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(token)
+                self.hits += 1
+                return entry[1]
+            if entry:
+                del self._entries[token]
+            self.misses += 1
+            generation = self._generation
+
+        try:
+            payload = jwt.decode(token, self._secret(), algorithms=['HS256'])
+        except jwt.ExpiredSignatureError:
+            raise AuthError('Token expired')
+        except jwt.InvalidTokenError:
+            raise AuthError('Token invalid')
+
+        user = self._load_user(payload.get('user_id'))
+        if not user:
+            raise AuthError('User not found')
+        snapshot = UserSnapshot(user.id, user.fname, user.lname, user.username, user.role, user.threshold)
+
+        expires_at = now + self.ttl
+        if payload.get('exp'):
+            expires_at = min(expires_at, payload['exp'])
+        with self._lock:
+            if generation == self._generation:
+                self._entries[token] = (expires_at, snapshot)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return snapshot
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            self._generation += 1
+            stale = [token for token, (_, snapshot) in self._entries.items() if snapshot.id == user_id]
+            for token in stale:
+                del self._entries[token]
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
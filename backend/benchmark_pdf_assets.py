@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+PDF Asset Benchmark
+Compares the size and build time of the image pages (cover + appendix) that get merged into
+every quotation PDF, using the original images vs. the downsampled copies from image_assets.
+
+Usage: python benchmark_pdf_assets.py [dpi ...]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import image_assets
+from pdf_generator import QuotationPDFGenerator
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+IMAGES_DIR = os.path.join(BASE_DIR, "images")
+
+
+def find_images():
+    images = []
+    for i in range(1, 9):
+        for ext in (".jpg", ".png", ".jpeg"):
+            p = os.path.join(IMAGES_DIR, f"{i}{ext}")
+            if os.path.exists(p):
+                images.append(p)
+                break
+    return images
+
+
+def build_pages(images, optimize, dpi=None):
+    """Build the image pages once and return (seconds, pdf size in bytes)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "pages.pdf")
+        start = time.perf_counter()
+        QuotationPDFGenerator._image_to_pdf(images, out, optimize=optimize, dpi=dpi)
+        elapsed = time.perf_counter() - start
+        return elapsed, os.path.getsize(out)
+
+
+def fmt_mb(n):
+    return f"{n / (1024 * 1024):.2f} MB"
+
+
+def main():
+    images = find_images()
+    if not images:
+        print("❌ No images found in images/")
+        return 1
+    if image_assets.Image is None:
+        print("⚠️  Pillow is not installed - optimized build will use the original images")
+
+    dpis = [int(a) for a in sys.argv[1:]] or [150, 200]
+    source_bytes = sum(os.path.getsize(p) for p in images)
+
+    print(f"🖼️  {len(images)} images, {fmt_mb(source_bytes)} on disk")
+    print("=" * 72)
+    print(f"{'Variant':<28}{'Build time':>14}{'PDF size':>14}{'vs. original':>16}")
+    print("-" * 72)
+
+    base_time, base_size = build_pages(images, optimize=False)
+    print(f"{'original':<28}{base_time:>13.2f}s{fmt_mb(base_size):>14}{'':>16}")
+
+    for dpi in dpis:
+        tag = image_assets.asset_settings_tag(dpi)
+        # First build prepares the optimized copies, second one reuses them
+        cold_time, size = build_pages(images, optimize=True, dpi=dpi)
+        warm_time, _ = build_pages(images, optimize=True, dpi=dpi)
+        ratio = f"{size / base_size * 100:.1f}%"
+        print(f"{tag + ' (cold)':<28}{cold_time:>13.2f}s{fmt_mb(size):>14}{ratio:>16}")
+        print(f"{tag + ' (cached assets)':<28}{warm_time:>13.2f}s{fmt_mb(size):>14}{ratio:>16}")
+
+    print("=" * 72)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Query Plan Check
+Drives the API against a scratch SQLite database, records every SQL statement the
+app issues and runs EXPLAIN QUERY PLAN on each. Exits non-zero if any statement
+reads a table with a full scan instead of an index, or if a paged batch statement
+(ORDERED_PAGES) sorts its rows instead of reading an index in order.
+
+Usage: python check_query_plans.py
+"""
+
+import os
+import re
+import shutil
+import sys
+import tempfile
+
+SCRATCH_DIR = tempfile.mkdtemp(prefix="plan-check-")
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(SCRATCH_DIR, 'plans.db')}"
+
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app import app, db, User, Quotation, seed_quotation_sequence
+
+# Statements that are expected to scan, with the reason
+ALLOWED_SCANS = {
+    "FROM quotation WHERE quotation.id LIKE": "one-time seed of the quotation counter",
+    "AS user_threshold \nFROM user": "approval re-evaluation loads every user's threshold once",
+}
+
+# Batch statements that page with ORDER BY ... LIMIT and must read an index in order: sorting in a
+# temp B-tree would re-sort all remaining rows for every page
+ORDERED_PAGES = {
+    "SELECT quotation.id AS quotation_id, quotation.created_by AS quotation_created_by":
+        "approval re-evaluation chunks by status and id",
+}
+TEMP_SORT = "USE TEMP B-TREE FOR"
+
+# "SCAN quotation" is a full table scan; "SCAN quotation USING INDEX ..." walks an index in order
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+def seed():
+    admin = User(username='plan-admin', role='admin', threshold=100)
+    admin.set_password('plan')
+    agent = User(username='plan-user', role='user', threshold=0)
+    agent.set_password('plan')
+    db.session.add_all([admin, agent])
+    base = datetime(2025, 1, 1)
+    for i in range(1, 41):
+        db.session.add(Quotation(
+            id=f'REQ {i:04d}', developer_type=('agent', 'cat1', 'cat2')[i % 3], project_region='Pune',
+            plot_area=1000, developer_name='Developer', created_by='plan-user' if i % 2 else 'Plan Admin',
+            status=('draft', 'pending_approval', 'approved')[i % 3], requires_approval=i % 3 == 1,
+            created_at=base + timedelta(hours=i), headers=[], pricing_breakdown=[]
+        ))
+    db.session.commit()
+    seed_quotation_sequence(reset=True)
+
+
+def drive(client):
+    """Call the data-backed endpoints the frontend uses"""
+    def login(username):
+        token = client.post('/api/login', json={'username': username, 'password': 'plan'}).json['token']
+        return {'Authorization': f'Bearer {token}'}
+
+    admin, user = login('plan-admin'), login('plan-user')
+    body = {'developerType': 'cat1', 'projectRegion': 'Pune', 'plotArea': 1000, 'developerName': 'D', 'headers': []}
+
+    calls = [
+        ('get', '/api/me', admin, None),
+        ('get', '/api/quotations', admin, None),
+        ('get', '/api/quotations?limit=10', admin, None),
+        ('get', '/api/quotations?status=approved&limit=10', admin, None),
+        ('get', '/api/quotations?developer_type=agent&created_by=plan-user&limit=10', admin, None),
+        ('get', '/api/quotations?developer_type=cat1', admin, None),
+        ('get', '/api/quotations?created_from=2025-01-01&created_to=2025-01-01', admin, None),
+        ('get', '/api/quotations/pending', admin, None),
+        ('get', '/api/quotations/pending?view=summary', admin, None),
+        ('get', '/api/agent-registrations', admin, None),
+        ('get', '/api/agent-registrations', user, None),
+        ('post', '/api/quotations', admin, body),
+        ('get', '/api/quotations/REQ 0001', admin, None),
+        ('put', '/api/quotations/REQ 0002', admin, {'projectName': 'P'}),
+        ('put', '/api/quotations/REQ 0002/pricing', admin, {'totalAmount': 1000, 'discountPercent': 1}),
+        ('put', '/api/quotations/REQ 0002/terms', admin, {'termsAccepted': True, 'customTerms': []}),
+        ('put', '/api/quotations/REQ 0002/approve', admin, {}),
+        ('post', '/api/system/reevaluate-approvals', admin, {}),
+        ('post', '/api/system/reevaluate-approvals', admin, {'username': 'plan-user', 'dryRun': True}),
+    ]
+    for method, url, headers, payload in calls:
+        response = getattr(client, method)(url, headers=headers, json=payload)
+        if response.status_code >= 500:
+            raise RuntimeError(f"{method.upper()} {url} failed with {response.status_code}")
+
+    # Keyset page two
+    cursor = client.get('/api/quotations?limit=5', headers=admin).json['nextCursor']
+    client.get(f'/api/quotations?limit=5&cursor={cursor}', headers=admin)
+
+
+def explain(connection, statement, parameters):
+    cursor = connection.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    return [row[3] for row in cursor.fetchall()]
+
+
+def main():
+    statements = {}
+
+    with app.app_context():
+        db.create_all()
+        seed()
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE')) and not executemany:
+                statements.setdefault(statement, parameters)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        drive(app.test_client())
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+        failures = 0
+        raw = db.engine.raw_connection()
+        try:
+            for statement, parameters in statements.items():
+                plan = explain(raw.cursor(), statement, parameters)
+                scans = [step for step in plan if FULL_SCAN.match(step)]
+                allowed = next((why for marker, why in ALLOWED_SCANS.items() if marker in statement), None)
+                paged = next((why for marker, why in ORDERED_PAGES.items() if marker in statement), None)
+                summary = ' '.join(statement.split())[:110]
+
+                if scans and not allowed:
+                    failures += 1
+                    print(f"❌ {summary}")
+                elif paged and any(TEMP_SORT in step for step in plan):
+                    failures += 1
+                    print(f"❌ {summary}  (sorts every page: {paged})")
+                elif scans:
+                    print(f"⚠️  {summary}  (allowed: {allowed})")
+                else:
+                    print(f"✅ {summary}")
+                for step in plan:
+                    print(f"      {step}")
+        finally:
+            raw.close()
+
+    print(f"\n📊 {len(statements)} distinct statements, {failures} full table scan(s) or sorted page(s)")
+    if failures:
+        print("❌ Add an index for the statements above or list them in ALLOWED_SCANS")
+        return 1
+    print("🎉 No unexpected full table scans")
+    return 0
+
+
+if __name__ == "__main__":
+    status = 1
+    try:
+        status = main()
+    finally:
+        shutil.rmtree(SCRATCH_DIR, ignore_errors=True)
+    sys.exit(status)
@@ -0,0 +1,4 @@
+# conftest.py - pytest imports app once for every test module; make that a scratch database too
+from database import use_scratch_database
+
+use_scratch_database()
@@ -0,0 +1,119 @@
+# database.py - Engine configuration: tuned SQLite (WAL + pragmas) or any SQLAlchemy URL such as PostgreSQL
+import atexit
+import os
+import shutil
+import tempfile
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+DEFAULT_DATABASE_URL = 'sqlite:///quotations.db'
+_scratch_database_url = None
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def sqlite_pragmas():
+    """
+    PRAGMAs applied to every new SQLite connection.
+
+    WAL lets readers run alongside the single writer, synchronous=NORMAL is
+    durable across application crashes in WAL mode (only an OS crash can lose
+    the last commits), and busy_timeout makes a writer wait for the lock
+    instead of failing with "database is locked".
+    """
+    return {
+        'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': _env_int('SQLITE_BUSY_TIMEOUT_MS', 10000),
+        'cache_size': -_env_int('SQLITE_CACHE_SIZE_KB', 64 * 1024),  # negative = KiB
+        'mmap_size': _env_int('SQLITE_MMAP_SIZE_MB', 256) * 1024 * 1024,
+    }
+
+
+def is_sqlite(url):
+    return make_url(url).get_backend_name() == 'sqlite'
+
+
+def engine_options(url, tuned=True):
+    """SQLALCHEMY_ENGINE_OPTIONS for url: pool sizing plus driver specific settings"""
+    url = make_url(url)
+    if not tuned:
+        return {}
+
+    if url.get_backend_name() == 'sqlite':
+        if url.database in (None, '', ':memory:'):
+            return {}  # in-memory databases use SQLAlchemy's single-connection pool
+        return {
+            # Connections are cheap and writes are serialized by SQLite anyway;
+            # the pool mostly saves reopening the file and re-running the PRAGMAs
+            'pool_size': _env_int('DB_POOL_SIZE', 10),
+            'max_overflow': _env_int('DB_MAX_OVERFLOW', 20),
+            'pool_timeout': _env_int('DB_POOL_TIMEOUT', 30),
+            'connect_args': {
+                'check_same_thread': False,
+                'timeout': _env_int('SQLITE_BUSY_TIMEOUT_MS', 10000) / 1000,
+            },
+        }
+
+    return {
+        'pool_size': _env_int('DB_POOL_SIZE', 10),
+        'max_overflow': _env_int('DB_MAX_OVERFLOW', 20),
+        'pool_timeout': _env_int('DB_POOL_TIMEOUT', 30),
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': True,
+    }
+
+
+def apply_sqlite_pragmas(engine, pragmas=None):
+    """Run the PRAGMAs on every connection the engine opens (no-op for other databases)"""
+    if engine.dialect.name != 'sqlite':
+        return
+    pragmas = sqlite_pragmas() if pragmas is None else pragmas
+
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def configure_database(app):
+    """
+    Fill the SQLAlchemy settings of app from the environment.
+
+    DATABASE_URL selects the database (sqlite:///quotations.db by default; a
+    postgresql:// URL works without code changes). DB_TUNING=0 falls back to
+    SQLAlchemy's defaults. Call init_database() once the SQLAlchemy extension
+    exists to install the SQLite PRAGMAs.
+    """
+    url = os.environ.get('DATABASE_URL', DEFAULT_DATABASE_URL)
+    tuned = os.environ.get('DB_TUNING', '1').lower() not in ('0', 'false', 'no')
+    app.config['SQLALCHEMY_DATABASE_URI'] = url
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(url, tuned)
+    app.config['DB_TUNING'] = tuned
+
+
+def init_database(app, db):
+    if app.config.get('DB_TUNING', True):
+        with app.app_context():
+            apply_sqlite_pragmas(db.engine)
+
+
+def use_scratch_database():
+    """
+    Point DATABASE_URL at a throwaway SQLite file that is removed at exit, so
+    tests never touch instance/quotations.db. Call before importing app; later
+    calls in the same process reuse the first scratch database.
+    """
+    global _scratch_database_url
+    if _scratch_database_url is None:
+        directory = tempfile.mkdtemp(prefix="rera-test-db-")
+        atexit.register(shutil.rmtree, directory, ignore_errors=True)
+        _scratch_database_url = f"sqlite:///{os.path.join(directory, 'test.db')}"
+    os.environ['DATABASE_URL'] = _scratch_database_url
+    return _scratch_database_url
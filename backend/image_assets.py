@@ -0,0 +1,116 @@
+# image_assets.py - Downsampled, recompressed copies of the PDF appendix images
+import hashlib
+import os
+import uuid
+import warnings
+
+from reportlab.lib.pagesizes import A4
+
+from app_logging import get_logger
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; without it the original images are used
+    Image = None
+
+log = get_logger(__name__)
+
+# Target print resolution and JPEG quality for images placed on A4 pages.
+# Override with PDF_IMAGE_DPI / PDF_IMAGE_QUALITY.
+ASSET_DPI = int(os.environ.get("PDF_IMAGE_DPI", 150))
+ASSET_QUALITY = int(os.environ.get("PDF_IMAGE_QUALITY", 80))
+
+# Optimized copies live next to the originals in images/<OPTIMIZED_DIR>
+OPTIMIZED_DIR = os.path.join(".cache", "optimized")
+
+
+def asset_settings_tag(dpi=None, quality=None):
+    """Short tag describing the active settings, used in cache file names"""
+    return f"{dpi or ASSET_DPI}dpi-q{quality or ASSET_QUALITY}"
+
+
+def target_size(dpi=None, page_size=A4):
+    """Pixel size of a full page at the given print resolution"""
+    dpi = dpi or ASSET_DPI
+    width_pt, height_pt = page_size
+    return int(round(width_pt / 72.0 * dpi)), int(round(height_pt / 72.0 * dpi))
+
+
+def prepare_image(image_path, dpi=None, quality=None, page_size=A4):
+    """
+    Return the path of an optimized copy of image_path, resampled to fit the
+    page at `dpi` and re-encoded as JPEG at `quality`. The copy is built once
+    and reused until the original's mtime or size changes. Falls back to the
+    original path if Pillow is missing, the image can't be read, or the
+    optimized copy would not be smaller. That last outcome is cached as well,
+    as an empty <name>.original marker, so the image isn't re-encoded on
+    every build.
+    """
+    if Image is None:
+        return image_path
+
+    dpi = dpi or ASSET_DPI
+    quality = quality or ASSET_QUALITY
+
+    try:
+        st = os.stat(image_path)
+    except OSError:
+        return image_path
+
+    images_dir, filename = os.path.split(os.path.abspath(image_path))
+    base = os.path.splitext(filename)[0]
+    source_hash = hashlib.sha1(f"{filename}|{st.st_mtime_ns}|{st.st_size}".encode("utf-8")).hexdigest()[:12]
+
+    out_dir = os.path.join(images_dir, OPTIMIZED_DIR)
+    prefix = f"{base}-{asset_settings_tag(dpi, quality)}-"
+    out_path = os.path.join(out_dir, f"{prefix}{source_hash}.jpg")
+    keep_original_path = os.path.join(out_dir, f"{prefix}{source_hash}.original")
+    if os.path.exists(out_path):
+        return out_path
+    if os.path.exists(keep_original_path):
+        return image_path
+
+    os.makedirs(out_dir, exist_ok=True)
+    tmp_path = os.path.join(out_dir, f"tmp-{uuid.uuid4().hex}.jpg")
+    try:
+        with warnings.catch_warnings():
+            # The source scans are very large but trusted local files
+            warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+            with Image.open(image_path) as im:
+                size = target_size(dpi, page_size)
+                # JPEG draft mode decodes at a reduced scale, which is far cheaper than a full decode
+                im.draft("RGB", size)
+                if im.mode in ("RGBA", "LA", "P"):
+                    im = im.convert("RGBA")
+                    background = Image.new("RGB", im.size, (255, 255, 255))
+                    background.paste(im, mask=im.split()[-1])
+                    im = background
+                elif im.mode != "RGB":
+                    im = im.convert("RGB")
+                im.thumbnail(size, Image.LANCZOS)
+                im.save(tmp_path, "JPEG", quality=quality, optimize=True, progressive=True, dpi=(dpi, dpi))
+
+        if os.path.getsize(tmp_path) >= st.st_size:
+            # Already compact enough: remember the decision instead of a copy
+            open(keep_original_path, "wb").close()
+            result_path = image_path
+        else:
+            os.replace(tmp_path, out_path)
+            result_path = out_path
+    except Exception as e:
+        log.warning('image.optimize_failed', image=image_path, error=str(e))
+        return image_path
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    # Drop copies (and markers) built from older versions of this image
+    for old in os.listdir(out_dir):
+        old_path = os.path.join(out_dir, old)
+        if old.startswith(prefix) and old_path not in (out_path, keep_original_path):
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+
+    return result_path
@@ -0,0 +1,153 @@
+# janitor.py - Single background sweeper that keeps PDF output directories bounded
+import os
+import threading
+import time
+
+from app_logging import get_logger
+
+log = get_logger(__name__)
+
+
+class FileJanitor:
+    """
+    One daemon thread that periodically sweeps a set of directories.
+
+    Each sweep removes:
+    - abandoned in-progress files (tmp-*) older than tmp_grace seconds
+    - files older than max_age seconds (if set)
+    - the least recently used files (oldest mtime first) until the total size
+      fits in max_total_bytes (if set)
+
+    Writers call track() after adding a file; once the bytes added since the
+    last sweep could push the directories over budget, the sweeper is woken
+    early instead of waiting for the next interval.
+    """
+
+    def __init__(self, directories, max_age=None, max_total_bytes=None, interval=60, tmp_grace=600):
+        self.directories = [os.path.abspath(d) for d in directories]
+        self.max_age = max_age
+        self.max_total_bytes = max_total_bytes
+        self.interval = interval
+        self.tmp_grace = tmp_grace
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self._files = 0
+        self._bytes = 0
+        self._tracked_bytes = 0
+        self._deleted_files = 0
+        self._deleted_bytes = 0
+        self._last_sweep_at = None
+        self._last_sweep_seconds = None
+
+    # ---------------- Lifecycle ----------------
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="file-janitor", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.sweep()
+            except Exception as e:
+                log.exception('janitor.sweep_failed', error=str(e))
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    # ---------------- Writers ----------------
+    def track(self, path, size):
+        """Record a newly written file, waking the sweeper if the budget may be exceeded"""
+        with self._lock:
+            self._files += 1
+            self._bytes += size
+            self._tracked_bytes += size
+            over_budget = self.max_total_bytes is not None and self._bytes > self.max_total_bytes
+        if over_budget:
+            self._wake.set()
+
+    # ---------------- Sweeping ----------------
+    def _scan(self):
+        entries = []
+        for d in self.directories:
+            if not os.path.isdir(d):
+                continue
+            for name in os.listdir(d):
+                path = os.path.join(d, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                if os.path.isfile(path):
+                    entries.append((st.st_mtime, st.st_size, name, path))
+        return entries
+
+    def _remove(self, path, size):
+        try:
+            os.remove(path)
+        except OSError:
+            return False
+        self._deleted_files += 1
+        self._deleted_bytes += size
+        return True
+
+    def sweep(self):
+        """Run one sweep now and return the resulting metrics"""
+        now = time.time()
+        kept = []
+
+        with self._lock:
+            for mtime, size, name, path in self._scan():
+                age = now - mtime
+                if name.startswith('tmp-'):
+                    if age > self.tmp_grace:
+                        self._remove(path, size)
+                    continue
+                if self.max_age is not None and age > self.max_age:
+                    self._remove(path, size)
+                    continue
+                kept.append((mtime, size, path))
+
+            total = sum(size for _, size, _ in kept)
+            if self.max_total_bytes is not None and total > self.max_total_bytes:
+                kept.sort()
+                while kept and total > self.max_total_bytes:
+                    _, size, path = kept.pop(0)
+                    if self._remove(path, size):
+                        total -= size
+
+            self._files = len(kept)
+            self._bytes = total
+            self._tracked_bytes = 0
+            self._last_sweep_at = now
+            self._last_sweep_seconds = round(time.time() - now, 4)
+
+        return self.metrics()
+
+    def metrics(self):
+        with self._lock:
+            return {
+                'directories': self.directories,
+                'files': self._files,
+                'bytesOnDisk': self._bytes,
+                'bytesAddedSinceSweep': self._tracked_bytes,
+                'maxTotalBytes': self.max_total_bytes,
+                'maxAgeSeconds': self.max_age,
+                'deletedFiles': self._deleted_files,
+                'deletedBytes': self._deleted_bytes,
+                'lastSweepAt': self._last_sweep_at,
+                'lastSweepSeconds': self._last_sweep_seconds,
+                'running': bool(self._thread and self._thread.is_alive()),
+            }
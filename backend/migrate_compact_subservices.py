@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Rewrite stored quotation headers and pricing breakdowns in the compact form:
+subservice lists copied from the service catalog become catalog references
+(see service_catalog.compact_subservices). Safe to run more than once.
+"""
+
+import json
+from app import app, db, Quotation
+
+BATCH_SIZE = 200
+
+if __name__ == "__main__":
+    print("🔧 Compacting stored subservices...")
+    with app.app_context():
+        before = after = rows = 0
+        last_id = ''
+        while True:
+            batch = (Quotation.query.filter(Quotation.id > last_id)
+                     .order_by(Quotation.id).limit(BATCH_SIZE).all())
+            if not batch:
+                break
+            for q in batch:
+                before += len(json.dumps(q.headers or [])) + len(json.dumps(q.pricing_breakdown or []))
+                # Re-assigning runs the Quotation validator, which stores the compact form
+                q.headers = list(q.headers or [])
+                q.pricing_breakdown = list(q.pricing_breakdown or [])
+                after += len(json.dumps(q.headers)) + len(json.dumps(q.pricing_breakdown))
+            rows += len(batch)
+            last_id = batch[-1].id
+            db.session.commit()
+            db.session.expunge_all()
+        print(f"✅ {rows} quotations: {before:,} -> {after:,} bytes of headers/pricing breakdown JSON")
+        print("🎉 Subservice compaction complete!")
@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+"""
+Add the composite Quotation indexes to an existing database.
+db.create_all() only creates indexes together with new tables; this adds the missing ones.
+"""
+
+from app import app, db, Quotation, ensure_quotation_indexes
+
+if __name__ == "__main__":
+    print("🔧 Adding quotation indexes...")
+    with app.app_context():
+        created = ensure_quotation_indexes()
+        for name in created:
+            print(f"✅ Created index {name}")
+        if not created:
+            print("✅ All indexes already exist")
+        print(f"🎉 Quotation indexes: {', '.join(sorted(ix.name for ix in Quotation.__table__.indexes))}")
@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+"""
+Seed the quotation number counter from the existing 'REQ N' ids.
+Safe to run repeatedly: the counter never moves backwards.
+"""
+
+from app import app, db, Counter, QUOTATION_COUNTER, highest_quotation_number, seed_quotation_sequence
+
+if __name__ == "__main__":
+    print("🔧 Migrating quotation numbers to the counter table...")
+    with app.app_context():
+        db.create_all()
+        highest = highest_quotation_number()
+        value = seed_quotation_sequence(reset=True)
+        print(f"✅ Highest existing quotation number: {highest}")
+        print(f"✅ Counter '{QUOTATION_COUNTER}' = {db.session.get(Counter, QUOTATION_COUNTER).value}")
+        print(f"🎉 Next quotation will be REQ {value + 1:04d}")
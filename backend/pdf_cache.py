@@ -0,0 +1,121 @@
+# pdf_cache.py - Content-addressed on-disk cache for rendered quotation PDFs
+import hashlib
+import json
+import os
+import threading
+import uuid
+
+
+class PDFRenderCache:
+    """
+    Stores rendered PDFs under <cache_dir>/<key>.pdf.
+
+    The key is a hash of everything that affects the output: the quotation
+    data, the template (name and the version of its compiled source, see
+    pdf_generator.template_version), the display mode and the mtimes of
+    the appendix images. Any edit to the quotation or its assets therefore
+    produces a new key, and stale entries simply age out. Total size on disk
+    is bounded by max_bytes; the least recently used files are evicted first
+    (a hit refreshes the file's mtime). When a FileJanitor is attached it does
+    the eviction in the background; otherwise every put() evicts inline.
+    """
+
+    def __init__(self, cache_dir, max_bytes=500 * 1024 * 1024, asset_dirs=(), janitor=None):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_bytes = max_bytes
+        self.asset_dirs = [os.path.abspath(d) for d in asset_dirs]
+        self.janitor = janitor
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    # ---------------- Keys ----------------
+    def _asset_fingerprint(self):
+        entries = []
+        for d in self.asset_dirs:
+            if not os.path.isdir(d):
+                continue
+            for name in sorted(os.listdir(d)):
+                # Skip derived files such as images/.cache
+                if name.startswith('.'):
+                    continue
+                try:
+                    st = os.stat(os.path.join(d, name))
+                except OSError:
+                    continue
+                entries.append((name, st.st_mtime_ns, st.st_size))
+        return entries
+
+    def key_for(self, quotation_data, template_name, display_mode, template_version=None):
+        """Build the cache key for a quotation rendered with a given template version"""
+        payload = json.dumps({
+            'quotation': quotation_data,
+            'template': os.path.basename(template_name),
+            'templateVersion': template_version,
+            'displayMode': display_mode,
+            'assets': self._asset_fingerprint(),
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pdf")
+
+    # ---------------- Lookup / store ----------------
+    def get(self, key):
+        """Return the cached PDF path for key, or None on a miss"""
+        path = self.path_for(key)
+        try:
+            os.utime(path, None)  # mark as recently used
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def put(self, key, data):
+        """Store rendered PDF bytes under key (atomically) and return the cached path"""
+        path = self.path_for(key)
+        tmp_path = os.path.join(self.cache_dir, f"tmp-{uuid.uuid4().hex}-{key}.pdf")
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        if self.janitor:
+            self.janitor.track(path, len(data))
+        else:
+            self.evict(keep=path)
+        return path
+
+    def evict(self, keep=None):
+        """Remove least recently used PDFs (except `keep`) until the cache fits in max_bytes"""
+        with self._lock:
+            entries = []
+            total = 0
+            for name in os.listdir(self.cache_dir):
+                # tmp-* files are renders in progress
+                if not name.endswith('.pdf') or name.startswith('tmp-'):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+            return total
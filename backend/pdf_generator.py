@@ -1,17 +1,136 @@
+import io
 import os
-from jinja2 import Environment, FileSystemLoader
+import hashlib
+import threading
+import uuid
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
 import pdfkit
 from pypdf import PdfWriter, PdfReader
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4
+from image_assets import prepare_image, asset_settings_tag
+from render_service import get_render_service
+from app_logging import get_logger
+
+log = get_logger(__name__)
+
+# Pre-rendered cover/appendix page PDFs live in images/<STATIC_PAGES_DIR>
+STATIC_PAGES_DIR = ".cache"
+_static_pages_lock = threading.Lock()
+_static_pages_data = {}  # path -> bytes of the current cover/appendix PDFs
+
+# Compiled template bytecode lives in <template_dir>/<TEMPLATE_CACHE_DIR>
+TEMPLATE_CACHE_DIR = ".jinja_cache"
+_template_envs = {}  # (template_dir, auto_reload) -> shared Jinja2 Environment
+_generators = {}  # (template_dir, use_summary_template) -> shared QuotationPDFGenerator
+_registry_lock = threading.Lock()
+
+
+def template_auto_reload(debug=None):
+    """
+    Whether PDF templates are re-checked on disk: PDF_TEMPLATE_AUTO_RELOAD if it
+    is set, otherwise only in debug mode (`debug`, or FLASK_DEBUG when not given).
+    """
+    value = os.environ.get("PDF_TEMPLATE_AUTO_RELOAD")
+    if value is None:
+        if debug is not None:
+            return bool(debug)
+        value = os.environ.get("FLASK_DEBUG", "")
+    return value.lower() in ("1", "true", "yes")
+
+
+_auto_reload = template_auto_reload()
+
+
+def set_template_auto_reload(enabled):
+    """Switch auto-reload for every shared generator (they look their environment up per use)"""
+    global _auto_reload
+    _auto_reload = bool(enabled)
+
+
+class VersionedFileSystemLoader(FileSystemLoader):
+    """FileSystemLoader that remembers a hash of the source each template was last compiled from"""
+
+    def __init__(self, searchpath):
+        super().__init__(searchpath)
+        self.versions = {}
+
+    def get_source(self, environment, template):
+        source, filename, uptodate = super().get_source(environment, template)
+        self.versions[template] = hashlib.sha1(source.encode("utf-8")).hexdigest()[:12]
+        return source, filename, uptodate
+
+
+def get_template_environment(template_dir=".", auto_reload=None):
+    """
+    Process-wide Jinja2 environment for template_dir. Compiled templates stay
+    in memory and their bytecode is cached on disk, so a restart skips the
+    parse/compile step too. Templates are only re-checked on disk when
+    auto_reload is on (debug).
+    """
+    template_dir = os.path.abspath(template_dir)
+    auto_reload = _auto_reload if auto_reload is None else auto_reload
+    key = (template_dir, auto_reload)
+    with _registry_lock:
+        env = _template_envs.get(key)
+        if env is None:
+            cache_dir = os.path.join(template_dir, TEMPLATE_CACHE_DIR)
+            os.makedirs(cache_dir, exist_ok=True)
+            env = Environment(
+                loader=VersionedFileSystemLoader(template_dir),
+                bytecode_cache=FileSystemBytecodeCache(cache_dir),
+                auto_reload=auto_reload,
+            )
+            _template_envs[key] = env
+        return env
+
+
+def template_version(template_name, template_dir="."):
+    """
+    Version of the compiled template that renders template_name right now. With
+    auto-reload off an edited file keeps rendering the old compiled template, so
+    PDF cache keys use this rather than the file's mtime.
+    """
+    env = get_template_environment(template_dir)
+    env.get_template(template_name)  # loads it, or reloads it when auto-reload sees a change
+    return env.loader.versions.get(template_name)
+
+
+def get_pdf_generator(use_summary_template=False, template_dir="."):
+    """Shared generator per template; generators hold no per-request state"""
+    key = (os.path.abspath(template_dir), bool(use_summary_template))
+    generator = _generators.get(key)
+    if generator is None:
+        generator = QuotationPDFGenerator(template_dir, use_summary_template)
+        with _registry_lock:
+            generator = _generators.setdefault(key, generator)
+    return generator
+
+
+def warm_up_pdf_generators(template_dir=".", auto_reload=None):
+    """
+    Build both shared generators and compile their templates ahead of the
+    first PDF request. Call once at app start; returns the template names
+    that were compiled.
+    """
+    if auto_reload is not None:
+        set_template_auto_reload(auto_reload)
+    warmed = []
+    for use_summary in (False, True):
+        generator = get_pdf_generator(use_summary, template_dir)
+        generator.env.get_template(generator.template_name)
+        warmed.append(generator.template_name)
+    return warmed
 
 
 class QuotationPDFGenerator:
-    def __init__(self, template_dir=".", use_summary_template=False):
+    TEMPLATE_NAME = "quotation_template.html"
+    SUMMARY_TEMPLATE_NAME = "quotation_summary_template.html"
+
+    def __init__(self, template_dir=".", use_summary_template=False, render_service=None):
         # Template setup
         self.template_dir = os.path.abspath(template_dir)
-        self.env = Environment(loader=FileSystemLoader(self.template_dir))
-        self.template_name = "quotation_summary_template.html" if use_summary_template else "quotation_template.html"
+        self.template_name = self.SUMMARY_TEMPLATE_NAME if use_summary_template else self.TEMPLATE_NAME
 
         # wkhtmltopdf setup (change path if installed elsewhere, or set env WKHTMLTOPDF_PATH)
         default_path = r"C:\\Program Files\\wkhtmltopdf\\bin\\wkhtmltopdf.exe"
@@ -23,6 +142,9 @@ class QuotationPDFGenerator:
             )
         self.config = pdfkit.configuration(wkhtmltopdf=self.path_wkhtmltopdf)
 
+        # Shared, bounded wkhtmltopdf worker pool (see render_service.py)
+        self.render_service = render_service or get_render_service()
+
         # wkhtmltopdf options
         self.wk_options = {
             "enable-local-file-access": None,  # allow file:// URIs
@@ -41,6 +163,11 @@ class QuotationPDFGenerator:
         }
 
     # ---------------- Utility helpers ----------------
+
+    @property
+    def env(self):
+        # Looked up per use, so set_template_auto_reload() also applies to existing generators
+        return get_template_environment(self.template_dir)
     def safe_number(self, v, default=0):
         if v is None:
             return default
@@ -53,12 +180,14 @@ class QuotationPDFGenerator:
         return default if v is None else str(v).strip()
 
     # ---------------- Public API ----------------
-    def generate_pdf(self, quotation_data, filename):
+    def generate_pdf(self, quotation_data, filename=None):
         """
         Build HTML from quotation_data, convert to PDF with wkhtmltopdf,
         and merge optional images before/after the generated content.
+        The whole pipeline runs in memory: returns the PDF bytes, or writes
+        them to filename and returns filename if one is given.
         """
-        print(f"📄 generate_pdf (OLD) called with template: {self.template_name}")
+        log.debug('pdf.generate', template=self.template_name)
         base_dir = os.path.dirname(os.path.abspath(__file__))
 
         # ---- Build section rows (header -> lines, subtotal) ----
@@ -141,41 +270,24 @@ class QuotationPDFGenerator:
             logo_src=logo_src or "",  # template uses {{ logo_src }} on the top-right
         )
 
-        # ---- HTML -> PDF ----
-        temp_pdf = filename.replace(".pdf", "_temp.pdf")
-        pdfkit.from_string(html_out, temp_pdf, configuration=self.config, options=self.wk_options)
+        # ---- HTML -> PDF (wkhtmltopdf stdout) ----
+        content_pdf = self.render_service.render(html_out, None, self.config, self.wk_options)
 
         # ---- Merge optional images (before/after) ----
-        self.combine_with_images(temp_pdf, filename)
+        return self.combine_with_images(content_pdf, filename)
 
-        # ---- Cleanup ----
-        try:
-            if os.path.exists(temp_pdf):
-                os.remove(temp_pdf)
-        except Exception:
-            pass
-
-        return filename
-
-    def generate_summary_pdf(self, quotation_data, filename):
+    def generate_summary_pdf(self, quotation_data, filename=None):
         """
         Generate PDF using the QuotationSummary template that mirrors the JSX component layout.
         This method processes the data exactly as it appears in the QuotationSummary.jsx component.
         **ENHANCED: Support for display mode functionality**
+        Returns the PDF bytes, or writes them to filename and returns filename if one is given.
         """
-        print(f"🚀 generate_summary_pdf called with template: {self.template_name}")
-        print(f"📊 DEBUG: Full quotation_data keys: {list(quotation_data.keys())}")
-        
         # **NEW: Get display mode from quotation data**
         display_mode = quotation_data.get('displayMode', 'bifurcated')
-        print(f"🔧 Display mode: {display_mode}")
-        
-        if quotation_data.get("pricingBreakdown"):
-            print(f"📊 DEBUG: pricingBreakdown structure:")
-            for i, breakdown in enumerate(quotation_data["pricingBreakdown"]):
-                print(f"  [{i}]: {breakdown}")
-        else:
-            print(f"📊 DEBUG: No pricingBreakdown found!")
+        log.debug('pdf.generate_summary', template=self.template_name, displayMode=display_mode,
+                  keys=lambda: list(quotation_data.keys()))
+        log.debug('pdf.pricing_breakdown', sample=True, breakdown=quotation_data.get("pricingBreakdown"))
         
         base_dir = os.path.dirname(os.path.abspath(__file__))
         
@@ -213,25 +325,20 @@ class QuotationPDFGenerator:
             
             # Get package total if this is a package
             if is_package:
-                print(f"🔍 DEBUG: Processing package '{header_name}'")
-                print(f"🔍 DEBUG: header_price_map: {header_price_map}")
-                
                 # Try to get package total from pricing breakdown
                 package_total = header_price_map.get(header_name.strip(), 0)
-                print(f"🔍 DEBUG: package_total from header_price_map: {package_total}")
+                package_total_source = 'header'
                 
                 # If package has services with pricing, sum them up
                 if not package_total and quotation_data.get("pricingBreakdown"):
-                    print(f"🔍 DEBUG: Looking for package breakdown...")
                     package_breakdown = next((b for b in quotation_data["pricingBreakdown"] 
                                             if (b.get("name", "").strip() == header_name.strip() or 
                                                 b.get("header", "").strip() == header_name.strip())), None)
-                    print(f"🔍 DEBUG: Found package_breakdown: {package_breakdown}")
                     if package_breakdown and package_breakdown.get("services"):
                         services_total = sum(self.safe_number(s.get("finalAmount") or s.get("totalAmount", 0)) 
                                            for s in package_breakdown["services"])
                         package_total = services_total
-                        print(f"🔍 DEBUG: Calculated package_total from services: {package_total}")
+                        package_total_source = 'services'
                 
                 # If still no package total, try to get it from the breakdown's totalAmount
                 if not package_total and quotation_data.get("pricingBreakdown"):
@@ -246,7 +353,7 @@ class QuotationPDFGenerator:
                             breakdown_name_from_header in header_name_lower):
                             # Try headerTotal first, then totalAmount
                             package_total = self.safe_number(breakdown.get("headerTotal") or breakdown.get("totalAmount", 0))
-                            print(f"🔍 DEBUG: Found package total from breakdown: {package_total}")
+                            package_total_source = 'breakdown'
                             break
                 
                 # Final fallback: if still zero, use sum of individual service prices from this header
@@ -259,9 +366,9 @@ class QuotationPDFGenerator:
                             svc_price = self.safe_number(svc.get("price", 0))
                         individual_sum += svc_price
                     package_total = individual_sum
-                    print(f"🔍 DEBUG: Using individual services sum as fallback: {package_total}")
+                    package_total_source = 'individual'
                 
-                print(f"🔍 DEBUG: Final package_total: {package_total}")
+                log.debug('pdf.package_total', header=header_name, total=package_total, source=package_total_source)
             
             for service in header.get("services", []) or []:
                 service_name = self.safe_string(service.get("name", ""))
@@ -279,12 +386,10 @@ class QuotationPDFGenerator:
                     # In lump sum mode, hide individual service prices
                     display_price = None
                     show_individual_price = False
-                    print(f"💡 Lump sum mode: Hiding individual price for '{service_name}'")
                 elif is_package:
                     # For packages in bifurcated mode, may still hide individual prices depending on design
                     # But for now, we'll show them in bifurcated mode
                     show_individual_price = True
-                    print(f"💡 Bifurcated mode: Showing individual price for '{service_name}': {display_price}")
                 
                 # Process subservices
                 sub_services = []
@@ -330,11 +435,9 @@ class QuotationPDFGenerator:
         
         # Calculate total amount (use edited prices from pricingBreakdown)
         total_amount = self.safe_number(quotation_data.get("totalAmount", 0))
-        print(f"💰 DEBUG: totalAmount from quotation_data: {total_amount}")
         
         if not total_amount and quotation_data.get("pricingBreakdown"):
             total_amount = 0
-            print(f"💰 DEBUG: Calculating total from pricingBreakdown...")
             for breakdown in quotation_data["pricingBreakdown"]:
                 if breakdown.get("services"):
                     for service in breakdown["services"]:
@@ -342,9 +445,8 @@ class QuotationPDFGenerator:
                         price = service.get("finalAmount") or service.get("totalAmount", 0)
                         safe_price = self.safe_number(price)
                         total_amount += safe_price
-                        print(f"💰 DEBUG: Adding service price {safe_price}, running total: {total_amount}")
         
-        print(f"💰 DEBUG: Final calculated total_amount: {total_amount}")
+        log.debug('pdf.total_amount', total=total_amount)
         
         # Process terms exactly as in QuotationSummary.jsx
         terms = []
@@ -432,16 +534,11 @@ class QuotationPDFGenerator:
         logo_png_path = os.path.join(base_dir, "logo.png")
         logo_jpg_path = os.path.join(base_dir, "logo.jpg")
         
-        print(f"Debug: Looking for logo.png at: {logo_png_path}")
-        print(f"Debug: PNG exists: {os.path.exists(logo_png_path)}")
-        print(f"Debug: Looking for logo.jpg at: {logo_jpg_path}")
-        print(f"Debug: JPG exists: {os.path.exists(logo_jpg_path)}")
-        
         logo_src = self._file_uri(logo_png_path)
         if logo_src is None:
             logo_src = self._file_uri(logo_jpg_path)
         
-        print(f"Debug: Final logo_src: {logo_src}")
+        log.debug('pdf.logo', src=logo_src)
         
         # **ENHANCED: Render HTML using the new template with display mode support**
         template = self.env.get_template(self.template_name)
@@ -458,32 +555,30 @@ class QuotationPDFGenerator:
             show_individual_prices=(display_mode == 'bifurcated')  # **NEW: Helper flag for template**
         )
         
-        # HTML -> PDF
-        temp_pdf = filename.replace(".pdf", "_temp.pdf")
-        pdfkit.from_string(html_out, temp_pdf, configuration=self.config, options=self.wk_options)
+        # HTML -> PDF (wkhtmltopdf stdout)
+        content_pdf = self.render_service.render(html_out, None, self.config, self.wk_options)
         
         # Merge optional images
-        self.combine_with_images(temp_pdf, filename)
-        
-        # Cleanup
-        try:
-            if os.path.exists(temp_pdf):
-                os.remove(temp_pdf)
-        except Exception:
-            pass
-        
-        return filename
+        return self.combine_with_images(content_pdf, filename)
 
     # -------------- Image merge helpers --------------
-    def _image_to_pdf(self, image_path, pdf_path):
-        """Convert a single image (JPG/PNG) into a one-page A4 PDF."""
+    @staticmethod
+    def _image_to_pdf(image_paths, pdf_path, optimize=True, dpi=None):
+        """
+        Convert images (JPG/PNG) into an A4 PDF, one page per image.
+        With optimize=True the images are first downsampled to the print DPI (see image_assets;
+        `dpi` overrides PDF_IMAGE_DPI).
+        """
         c = canvas.Canvas(pdf_path, pagesize=A4)
         width, height = A4
-        try:
-            c.drawImage(image_path, 0, 0, width, height, preserveAspectRatio=True, anchor="c")
-        except Exception as e:
-            print(f"Warning: Could not draw image {image_path}: {e}")
-        c.showPage()
+        for image_path in image_paths:
+            if optimize:
+                image_path = prepare_image(image_path, dpi=dpi)
+            try:
+                c.drawImage(image_path, 0, 0, width, height, preserveAspectRatio=True, anchor="c")
+            except Exception as e:
+                log.warning('pdf.image_skipped', image=image_path, error=str(e))
+            c.showPage()
         c.save()
         return pdf_path
 
@@ -494,59 +589,116 @@ class QuotationPDFGenerator:
                 return p
         return None
 
-    def _add_pdf(self, writer, path):
+    def _static_pages_pdf(self, images_dir, name, bases):
+        """
+        Return the path of a PDF holding the pages for images/<bases>, rendering it
+        only if no up-to-date copy exists. The file name carries a hash of the
+        images' paths, mtimes and sizes, so editing an image triggers a rebuild.
+        """
+        images = [p for p in (self._find_image(images_dir, b) for b in bases) if p]
+        if not images:
+            return None
+
+        fingerprint = hashlib.sha1(asset_settings_tag().encode("utf-8"))
+        for p in images:
+            st = os.stat(p)
+            fingerprint.update(f"{p}|{st.st_mtime_ns}|{st.st_size}\n".encode("utf-8"))
+
+        cache_dir = os.path.join(images_dir, STATIC_PAGES_DIR)
+        pdf_path = os.path.join(cache_dir, f"{name}-{fingerprint.hexdigest()[:16]}.pdf")
+        if os.path.exists(pdf_path):
+            return pdf_path
+
+        with _static_pages_lock:
+            if os.path.exists(pdf_path):
+                return pdf_path
+
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = os.path.join(cache_dir, f"tmp-{uuid.uuid4().hex}.pdf")
+            try:
+                self._image_to_pdf(images, tmp_path)
+                os.replace(tmp_path, pdf_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+            # Drop stale renders of the same page set
+            for old in os.listdir(cache_dir):
+                old_path = os.path.join(cache_dir, old)
+                if old.startswith(f"{name}-") and old_path != pdf_path:
+                    try:
+                        os.remove(old_path)
+                    except OSError:
+                        pass
+
+        return pdf_path
+
+    def _static_pages_bytes(self, pdf_path):
+        """Contents of a pre-rendered page PDF, read from disk once per version"""
+        if not pdf_path:
+            return None
+        # Request threads and PDF job workers share the cache; look up, evict and insert under the lock
+        with _static_pages_lock:
+            data = _static_pages_data.get(pdf_path)
+            if data is None:
+                with open(pdf_path, "rb") as f:
+                    data = f.read()
+                name = os.path.basename(pdf_path).rsplit("-", 1)[0]
+                for old in [p for p in _static_pages_data if os.path.basename(p).rsplit("-", 1)[0] == name]:
+                    del _static_pages_data[old]
+                _static_pages_data[pdf_path] = data
+        return data
+
+    def _add_pdf(self, writer, source):
+        """Append all pages of a PDF given as a path or as bytes"""
         try:
-            reader = PdfReader(path)
+            reader = PdfReader(io.BytesIO(source) if isinstance(source, bytes) else source)
             for p in reader.pages:
                 writer.add_page(p)
         except Exception as e:
-            print(f"Warning: Could not read PDF {path}: {e}")
+            label = "<in-memory PDF>" if isinstance(source, bytes) else source
+            log.warning('pdf.merge_skipped', source=label, error=str(e))
 
-    def combine_with_images(self, generated_pdf, final_pdf):
+    def combine_with_images(self, generated_pdf, final_pdf=None):
         """
-        Merge optional images from ./images with the generated PDF.
+        Merge optional images from ./images with the generated PDF (path or bytes).
         Order:
         - images/1.(jpg|png|jpeg) -> before main content
         - generated pdf
         - images/2..8.(jpg|png|jpeg) -> after main content
+        The image pages are pre-rendered once (see _static_pages_pdf) and reused.
+        Returns the merged PDF bytes, or final_pdf after writing to it if given.
         """
         base_dir = os.path.dirname(os.path.abspath(__file__))
         images_dir = os.path.join(base_dir, "images")
         writer = PdfWriter()
-        temps = []
 
-        try:
-            # Prepend page
-            if os.path.isdir(images_dir):
-                first = self._find_image(images_dir, "1")
-                if first:
-                    t = os.path.join(base_dir, "temp_first.pdf")
-                    self._image_to_pdf(first, t)
-                    temps.append(t)
-                    self._add_pdf(writer, t)
-
-            # Main content
-            self._add_pdf(writer, generated_pdf)
-
-            # Append pages
-            if os.path.isdir(images_dir):
-                for i in range(2, 9):
-                    img = self._find_image(images_dir, str(i))
-                    if img:
-                        t = os.path.join(base_dir, f"temp_{i}.pdf")
-                        self._image_to_pdf(img, t)
-                        temps.append(t)
-                        self._add_pdf(writer, t)
+        cover_pdf = appendix_pdf = None
+        if os.path.isdir(images_dir):
+            cover_pdf = self._static_pages_bytes(self._static_pages_pdf(images_dir, "cover", ["1"]))
+            appendix_pdf = self._static_pages_bytes(
+                self._static_pages_pdf(images_dir, "appendix", [str(i) for i in range(2, 9)])
+            )
+
+        # Prepend page
+        if cover_pdf:
+            self._add_pdf(writer, cover_pdf)
 
+        # Main content
+        self._add_pdf(writer, generated_pdf)
+
+        # Append pages
+        if appendix_pdf:
+            self._add_pdf(writer, appendix_pdf)
+
+        if final_pdf:
             with open(final_pdf, "wb") as f:
                 writer.write(f)
-        finally:
-            for t in temps:
-                try:
-                    if os.path.exists(t):
-                        os.remove(t)
-                except Exception:
-                    pass
+            return final_pdf
+
+        out = io.BytesIO()
+        writer.write(out)
+        return out.getvalue()
 
     # -------------- Path helper --------------
     def _file_uri(self, path):
@@ -0,0 +1,89 @@
+# pdf_jobs.py - Background PDF render jobs executed by a local worker pool
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from app_logging import get_logger
+
+log = get_logger(__name__)
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+
+class PDFJob:
+    def __init__(self, quotation_id, filename):
+        self.id = uuid.uuid4().hex
+        self.quotation_id = quotation_id
+        self.filename = filename
+        self.status = JOB_QUEUED
+        self.result = None  # path to the cached PDF (or PDF bytes)
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self):
+        return {
+            'jobId': self.id,
+            'quotationId': self.quotation_id,
+            'status': self.status,
+            'error': self.error,
+            'createdAt': self.created_at,
+            'startedAt': self.started_at,
+            'finishedAt': self.finished_at,
+        }
+
+
+class PDFJobManager:
+    """
+    In-process job table plus a thread pool that runs render functions.
+
+    A render function takes no arguments and returns the finished PDF, either
+    as a file path or as bytes. Prefer paths: finished jobs are kept for
+    job_ttl seconds so clients can poll and download them, and bytes would
+    stay in memory that long. Expired jobs are dropped whenever the table is
+    used (submit or get).
+    """
+
+    def __init__(self, max_workers=2, job_ttl=3600):
+        self.job_ttl = job_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pdf-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, quotation_id, filename, render_fn):
+        job = PDFJob(quotation_id, filename)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, render_fn)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            self._prune()
+            return self._jobs.get(job_id)
+
+    def _prune(self):
+        cutoff = time.time() - self.job_ttl
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_at and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _run(self, job, render_fn):
+        job.status = JOB_RUNNING
+        job.started_at = time.time()
+        try:
+            job.result = render_fn()
+            job.status = JOB_DONE
+        except Exception as e:
+            job.error = str(e)
+            job.status = JOB_FAILED
+            log.exception('pdf.job_render_failed', job=job.id, id=job.quotation_id, error=str(e))
+        finally:
+            job.finished_at = time.time()
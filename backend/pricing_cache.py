@@ -0,0 +1,135 @@
+# pricing_cache.py - In-memory pricing table that reloads only when pricing_data.json changes
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from services_data import PricingIndex
+
+PricingSnapshot = namedtuple('PricingSnapshot', ['data', 'index', 'version'])
+
+
+class PricingDataCache:
+    """
+    Holds the parsed and indexed pricing table for a JSON file.
+
+    The file is stat()ed at most once every `check_interval` seconds. A reload
+    happens only when its mtime or size changes, and the new content replaces
+    the cached table only when its hash differs. `version` is a short content
+    hash, so it stays stable across touches that don't change the data.
+    """
+
+    def __init__(self, path, check_interval=1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot = PricingSnapshot([], PricingIndex([]), None)
+        self._stat_key = None
+        self._last_check = 0.0
+        self.reload_count = 0
+
+    @property
+    def version(self):
+        return self.get().version
+
+    def get(self):
+        """Return the current PricingSnapshot, reloading it first if the file changed"""
+        now = time.monotonic()
+        if self._stat_key is not None and now - self._last_check < self.check_interval:
+            return self._snapshot
+
+        with self._lock:
+            if self._stat_key is None or now - self._last_check >= self.check_interval:
+                self._last_check = now
+                self._refresh()
+            return self._snapshot
+
+    def invalidate(self):
+        """Force the next get() to re-check the file"""
+        with self._lock:
+            self._stat_key = None
+
+    def _refresh(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._stat_key = ('missing',)
+            if self._snapshot.version is not None:
+                self._snapshot = PricingSnapshot([], PricingIndex([]), None)
+            return
+
+        stat_key = (st.st_mtime_ns, st.st_size)
+        if stat_key == self._stat_key:
+            return
+
+        with open(self.path, 'rb') as f:
+            raw = f.read()
+        version = hashlib.sha1(raw).hexdigest()[:12]
+
+        if version != self._snapshot.version:
+            try:
+                data = json.loads(raw)
+            except ValueError:
+                # File is probably mid-write; keep serving the previous table and retry later
+                return
+            self._snapshot = PricingSnapshot(data, PricingIndex(data), version)
+            self.reload_count += 1
+
+        self._stat_key = stat_key
+
+
+class PricingResultCache:
+    """
+    LRU cache of pricing results for one pricing-data version.
+
+    Keys are canonical request keys (see ServicesDataManager.pricing_request_key).
+    When a lookup arrives with a different version the cache is emptied, so
+    results computed from an older pricing table are never served. Cached
+    results are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_size=2048):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, version, key, compute):
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+            self.misses += 1
+
+        result = compute()
+        with self._lock:
+            if version == self._version:
+                self._entries[key] = result
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'maxSize': self.max_size,
+                'version': self._version,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
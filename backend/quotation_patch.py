@@ -0,0 +1,203 @@
+# quotation_patch.py - JSON Patch (RFC 6902 add/remove/replace/test) for quotation headers, pricing and totals
+import copy
+
+PATCH_OPS = ('add', 'remove', 'replace', 'test')
+
+# List fields made of header sections ({'header': ..., 'services': [...]}, ...)
+SECTION_FIELDS = ('headers', 'pricingBreakdown')
+
+# Scalar fields that can be replaced or tested, with the type they are stored as
+SCALAR_FIELDS = {
+    'totalAmount': float,
+    'discountAmount': float,
+    'discountPercent': float,
+    'serviceSummary': str,
+    'displayMode': str,
+}
+
+
+class PatchError(ValueError):
+    pass
+
+
+class PatchConflict(PatchError):
+    """A 'test' operation did not match"""
+
+
+def parse_pointer(path):
+    """JSON Pointer -> list of unescaped reference tokens"""
+    if not isinstance(path, str) or not path.startswith('/'):
+        raise PatchError(f"Invalid path {path!r}")
+    return [token.replace('~1', '/').replace('~0', '~') for token in path[1:].split('/')]
+
+
+def _list_index(items, token, path, adding=False):
+    if adding and token == '-':
+        return len(items)
+    if not token.isdigit() or (len(token) > 1 and token[0] == '0'):
+        raise PatchError(f"Invalid list index '{token}' in {path}")
+    index = int(token)
+    if index > len(items) or (index == len(items) and not adding):
+        raise PatchError(f"Index {index} out of range in {path}")
+    return index
+
+
+def _test(current, value, path):
+    if current != value:
+        raise PatchConflict(f"Test failed at {path}")
+
+
+def apply_operation(document, tokens, operation):
+    """Apply one operation in place at tokens (relative to document)"""
+    op, path = operation['op'], operation['path']
+    node = document
+    for token in tokens[:-1]:
+        if isinstance(node, list):
+            node = node[_list_index(node, token, path)]
+        elif isinstance(node, dict) and token in node:
+            node = node[token]
+        else:
+            raise PatchError(f"Path {path} does not exist")
+
+    last = tokens[-1]
+    value = operation.get('value')
+    if isinstance(node, list):
+        index = _list_index(node, last, path, adding=op == 'add')
+        if op == 'add':
+            node.insert(index, value)
+        elif op == 'remove':
+            del node[index]
+        elif op == 'replace':
+            node[index] = value
+        else:
+            _test(node[index], value, path)
+    elif isinstance(node, dict):
+        if op == 'add':
+            node[last] = value
+        elif last not in node:
+            raise PatchError(f"Path {path} does not exist")
+        elif op == 'remove':
+            del node[last]
+        elif op == 'replace':
+            node[last] = value
+        else:
+            _test(node[last], value, path)
+    else:
+        raise PatchError(f"Path {path} does not exist")
+
+
+def _check_operation(operation):
+    if not isinstance(operation, dict) or operation.get('op') not in PATCH_OPS:
+        raise PatchError(f"Each operation needs an op out of {', '.join(PATCH_OPS)}")
+    if operation['op'] != 'remove' and 'value' not in operation:
+        raise PatchError(f"'{operation['op']}' at {operation.get('path')} needs a value")
+    return parse_pointer(operation.get('path'))
+
+
+class QuotationPatch:
+    """
+    Applies patch operations to a quotation's stored sections and scalar fields.
+
+    Only the sections an operation reaches into are expanded (expand_section)
+    and copied; everything else is passed through untouched. finish() then
+    re-processes touched headers and recomputes touched pricing header totals.
+    All operations are applied to copies, so a failing patch changes nothing.
+    """
+
+    def __init__(self, sections, scalars, expand_section):
+        self.sections = {field: list(sections.get(field) or []) for field in SECTION_FIELDS}
+        self.scalars = dict(scalars)
+        self.changed = set()
+        self._expand_section = expand_section
+        self._touched = {field: [] for field in SECTION_FIELDS}
+
+    def apply(self, operations):
+        for operation in operations:
+            tokens = _check_operation(operation)
+            field = tokens[0]
+            if field in SCALAR_FIELDS:
+                self._apply_scalar(field, tokens, operation)
+            elif field in SECTION_FIELDS:
+                self._apply_section(field, tokens, operation)
+            else:
+                raise PatchError(f"Cannot patch /{field}")
+
+    def _apply_scalar(self, field, tokens, operation):
+        if len(tokens) != 1 or operation['op'] not in ('replace', 'test'):
+            raise PatchError(f"Only replace and test are supported on /{field}")
+        try:
+            value = SCALAR_FIELDS[field](operation['value'])
+        except (TypeError, ValueError):
+            raise PatchError(f"Invalid value for /{field}")
+        if operation['op'] == 'test':
+            _test(self.scalars.get(field), value, operation['path'])
+        else:
+            self.scalars[field] = value
+            self.changed.add(field)
+
+    def _apply_section(self, field, tokens, operation):
+        sections = self.sections[field]
+        if len(tokens) == 1:
+            raise PatchError(f"Patch individual entries of /{field} (use PUT to replace it all)")
+
+        op = operation['op']
+        if len(tokens) == 2:
+            # A whole section: added / replaced ones are new input, so they count as touched
+            if op in ('add', 'replace'):
+                if not isinstance(operation['value'], dict):
+                    raise PatchError(f"{operation['path']} must be an object")
+                operation = dict(operation, value=copy.deepcopy(operation['value']))
+                self._touched[field].append(operation['value'])
+            elif op == 'test':
+                section = sections[_list_index(sections, tokens[1], operation['path'])]
+                _test(self._expand_section(section), operation['value'], operation['path'])
+                return
+            apply_operation(sections, tokens[1:], operation)
+            self.changed.add(field)
+            return
+
+        index = _list_index(sections, tokens[1], operation['path'])
+        section = sections[index]
+        if not self._is_touched(field, section):
+            section = copy.deepcopy(self._expand_section(section))
+            if op == 'test':
+                apply_operation(section, tokens[2:], operation)
+                return
+            sections[index] = section
+            self._touched[field].append(section)
+        apply_operation(section, tokens[2:], operation)
+        if op != 'test':
+            self.changed.add(field)
+
+    def _is_touched(self, field, section):
+        return any(section is touched for touched in self._touched[field])
+
+    def touched_indexes(self, field):
+        """Positions of the sections this patch changed, in the patched list"""
+        return [i for i, section in enumerate(self.sections[field]) if self._is_touched(field, section)]
+
+    def finish(self, process_header):
+        """Re-process touched headers and recompute the totals of touched pricing sections"""
+        headers = self.sections['headers']
+        indexes = self.touched_indexes('headers')
+        for i in indexes:
+            headers[i] = process_header(headers[i])
+        self._touched['headers'] = [headers[i] for i in indexes]
+
+        for section in self._touched['pricingBreakdown']:
+            services = section.get('services')
+            if not isinstance(services, list):
+                continue
+            header_total = 0.0
+            for service in services:
+                if not isinstance(service, dict):
+                    continue
+                # Same fallback as a full pricing save
+                if 'totalAmount' not in service and 'finalAmount' in service:
+                    service['totalAmount'] = service['finalAmount']
+                amount = service.get('finalAmount', service.get('totalAmount')) or 0
+                try:
+                    header_total += float(amount)
+                except (TypeError, ValueError):
+                    raise PatchError(f"Invalid amount for service {service.get('id')}")
+            section['headerTotal'] = round(header_total, 2)
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Re-check draft and pending quotations against the approval rules, e.g. after a
+user's threshold or the pricing rules changed.
+
+Usage: python reevaluate_approvals.py [username] [--dry-run]
+"""
+
+import sys
+from app import app, reevaluate_approvals
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if arg != '--dry-run']
+    dry_run = '--dry-run' in sys.argv[1:]
+    username = args[0] if args else None
+
+    print(f"🔧 Re-evaluating approvals for {username or 'all users'}{' (dry run)' if dry_run else ''}...")
+    with app.app_context():
+        result = reevaluate_approvals(username=username, dry_run=dry_run)
+    print(f"✅ Scanned {result['scanned']} quotations in {result['chunks']} chunk(s)")
+    print(f"✅ {result['toPending']} now pending approval, {result['toDraft']} back to draft, "
+          f"{result['unchanged']} unchanged")
+    if result['unknownCreator']:
+        print(f"⚠️  {result['unknownCreator']} created by unknown users were skipped")
+    if result['ambiguousCreator']:
+        print(f"⚠️  {result['ambiguousCreator']} created under a display name shared by users with "
+              f"different thresholds were skipped")
+    if result['conflicts']:
+        print(f"⚠️  {result['conflicts']} changed while running and were left alone")
+    print(f"🎉 Done in {result['seconds']}s")
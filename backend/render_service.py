@@ -0,0 +1,134 @@
+# render_service.py - Bounded pool of wkhtmltopdf renderers shared by all PDF requests
+import os
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import pdfkit
+
+
+class RenderError(Exception):
+    """wkhtmltopdf failed to produce a PDF"""
+
+
+class RenderTimeout(RenderError):
+    """A render job took longer than the per-job timeout"""
+
+
+class RenderQueueFull(RenderError):
+    """Too many render jobs are already waiting for a worker"""
+
+
+class RenderService:
+    """
+    Runs wkhtmltopdf jobs on a fixed number of worker threads, each driving at
+    most one wkhtmltopdf process at a time. Jobs beyond max_workers wait in a
+    queue (up to max_queue of them, for at most queue_timeout seconds) instead
+    of forking more processes, and each process is killed after job_timeout.
+    """
+
+    def __init__(self, max_workers=2, job_timeout=60, queue_timeout=120, max_queue=50):
+        self.max_workers = max_workers
+        self.job_timeout = job_timeout
+        self.queue_timeout = queue_timeout
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pdf-render")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._active = 0
+        self.completed = 0
+        self.failed = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.max_workers,
+                'active': self._active,
+                'queued': self._pending - self._active,
+                'completed': self.completed,
+                'failed': self.failed,
+            }
+
+    def render(self, html, output_path, configuration, options):
+        """
+        Render html to a PDF. With output_path=None the PDF is returned as bytes,
+        otherwise it is written to output_path. Blocks until the job finishes.
+        """
+        with self._lock:
+            if self._pending - self._active >= self.max_queue:
+                raise RenderQueueFull(f"PDF render queue is full ({self.max_queue} jobs waiting)")
+            self._pending += 1
+
+        future = self._executor.submit(self._run, html, output_path, configuration, options)
+        try:
+            return future.result(timeout=self.queue_timeout + self.job_timeout)
+        except FutureTimeout:
+            if future.cancel():
+                self._finish(ok=False, started=False)
+            raise RenderTimeout("Timed out waiting for a free PDF renderer")
+
+    def _finish(self, ok, started=True):
+        with self._lock:
+            self._pending -= 1
+            if started:
+                self._active -= 1
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    def _run(self, html, output_path, configuration, options):
+        with self._lock:
+            self._active += 1
+
+        ok = False
+        try:
+            kit = pdfkit.PDFKit(html, 'string', options=options, configuration=configuration)
+            args = kit.command(output_path or '-')
+            try:
+                result = subprocess.run(
+                    args,
+                    input=html.encode('utf-8'),
+                    capture_output=True,
+                    env=kit.environ,
+                    timeout=self.job_timeout
+                )
+            except subprocess.TimeoutExpired:
+                raise RenderTimeout(f"wkhtmltopdf did not finish within {self.job_timeout}s")
+
+            stderr = (result.stderr or b"").decode('utf-8', errors='replace')
+            try:
+                kit.handle_error(result.returncode, stderr)
+            except IOError as e:
+                raise RenderError(str(e))
+
+            if output_path is None:
+                if not result.stdout:
+                    raise RenderError("wkhtmltopdf produced no output")
+                ok = True
+                return result.stdout
+
+            if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+                raise RenderError(f"wkhtmltopdf produced no output at {output_path}")
+            ok = True
+            return output_path
+        finally:
+            self._finish(ok)
+
+
+_default_service = None
+_default_lock = threading.Lock()
+
+
+def get_render_service():
+    """Process-wide RenderService, sized from PDF_RENDER_WORKERS / PDF_RENDER_TIMEOUT / PDF_RENDER_QUEUE"""
+    global _default_service
+    if _default_service is None:
+        with _default_lock:
+            if _default_service is None:
+                _default_service = RenderService(
+                    max_workers=int(os.environ.get('PDF_RENDER_WORKERS', min(4, os.cpu_count() or 2))),
+                    job_timeout=int(os.environ.get('PDF_RENDER_TIMEOUT', 60)),
+                    max_queue=int(os.environ.get('PDF_RENDER_QUEUE', 50))
+                )
+    return _default_service
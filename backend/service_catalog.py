@@ -0,0 +1,242 @@
+# service_catalog.py - Versioned service catalog loaded from services_catalog.json
+import hashlib
+import json
+import os
+import threading
+import time
+from types import MappingProxyType
+
+from app_logging import get_logger
+
+log = get_logger(__name__)
+
+CATALOG_SCHEMA_VERSION = 1
+CATALOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'services_catalog.json')
+
+# Per-service flags: (requiresYearQuarter, requiresYearOnly)
+NO_SERVICE_FLAGS = (False, False)
+
+# Stored in place of a service's 'subServices' when the list is the catalog's own:
+# {"catalog": <version>, "excluded": [subservice ids with included=False]}
+SUBSERVICES_REF = 'subServicesRef'
+
+
+class CatalogError(ValueError):
+    pass
+
+
+def validate_catalog(data):
+    """Raise CatalogError if data is not a usable catalog (see services_catalog.json)"""
+    if not isinstance(data, dict):
+        raise CatalogError("Catalog must be a JSON object")
+    if data.get('schemaVersion') != CATALOG_SCHEMA_VERSION:
+        raise CatalogError(f"Unsupported catalog schemaVersion {data.get('schemaVersion')!r}")
+
+    services = data.get('services')
+    if not isinstance(services, dict) or not services:
+        raise CatalogError("'services' must be a non-empty object")
+    for service_id, service in services.items():
+        if not isinstance(service, dict) or not isinstance(service.get('name'), str) or not service['name'].strip():
+            raise CatalogError(f"Service '{service_id}' needs a name")
+        if not isinstance(service.get('origin'), str):
+            raise CatalogError(f"Service '{service_id}' needs an origin")
+        subservices = service.get('subServices', [])
+        if not isinstance(subservices, list):
+            raise CatalogError(f"Service '{service_id}' subServices must be a list")
+        for sub in subservices:
+            if not isinstance(sub, dict) or not isinstance(sub.get('id'), str):
+                raise CatalogError(f"Service '{service_id}' has a subservice without an id")
+            if not isinstance(sub.get('name'), str) or not sub['name'].strip():
+                raise CatalogError(f"Service '{service_id}' subservice '{sub['id']}' needs a name")
+        for flag in ('requiresYearQuarter', 'requiresYearOnly'):
+            if not isinstance(service.get(flag, False), bool):
+                raise CatalogError(f"Service '{service_id}' {flag} must be true or false")
+
+    packages = data.get('packages', {})
+    if not isinstance(packages, dict):
+        raise CatalogError("'packages' must be an object")
+    for package, service_ids in packages.items():
+        if not isinstance(service_ids, list):
+            raise CatalogError(f"Package '{package}' must list service ids")
+        unknown = [service_id for service_id in service_ids if service_id not in services]
+        if unknown:
+            raise CatalogError(f"Package '{package}' references unknown services: {', '.join(unknown)}")
+
+
+class ServiceCatalog:
+    """
+    An immutable, validated catalog plus the tables compiled from it:
+    cleaned subservices, per-service pricing flags and package service ids.
+
+    `version` is a short hash of the file content and doubles as the ETag;
+    `response_body` is the pre-serialized read-only API response.
+    """
+
+    def __init__(self, raw):
+        data = json.loads(raw)
+        validate_catalog(data)
+
+        self.version = hashlib.sha1(raw).hexdigest()[:12]
+        self.content = raw.decode('utf-8')
+        self.services = MappingProxyType(data['services'])
+
+        subservices, flags = {}, {}
+        for service_id, service in self.services.items():
+            cleaned = []
+            for sub in service.get('subServices', []):
+                # Filter out any numeric-only entries and ensure proper formatting
+                name = sub['name'].strip()
+                if name and not name.isdigit():
+                    cleaned.append((sub['id'], name, sub.get('included', True)))
+            subservices[service_id] = tuple(cleaned)
+            flags[service_id] = (service.get('requiresYearQuarter', False), service.get('requiresYearOnly', False))
+        self.subservices = MappingProxyType(subservices)
+        self.flags = MappingProxyType(flags)
+        self.packages = MappingProxyType({
+            package.lower(): tuple(service_ids) for package, service_ids in data.get('packages', {}).items()
+        })
+
+        self.response_body = json.dumps({'success': True, 'version': self.version, 'data': data},
+                                        ensure_ascii=False).encode('utf-8')
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, 'rb') as f:
+            return cls(f.read())
+
+    def service_flags(self, service_id):
+        return self.flags.get(service_id, NO_SERVICE_FLAGS)
+
+
+class CatalogLoader:
+    """
+    Loads the catalog on first use and re-checks the file at most every
+    check_interval seconds, swapping in a new catalog only when the file
+    changed and the new content validates. A broken edit keeps the previous
+    catalog in service.
+    """
+
+    def __init__(self, path=CATALOG_FILE, check_interval=5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._catalog = None
+        self._stat_key = None
+        self._last_check = 0.0
+        self.reload_count = 0
+
+    def get(self):
+        now = time.monotonic()
+        if self._catalog is not None and now - self._last_check < self.check_interval:
+            return self._catalog
+
+        with self._lock:
+            if self._catalog is None or now - self._last_check >= self.check_interval:
+                self._last_check = now
+                self._refresh()
+            return self._catalog
+
+    def _refresh(self):
+        try:
+            st = os.stat(self.path)
+            stat_key = (st.st_mtime_ns, st.st_size)
+            if stat_key == self._stat_key:
+                return
+            catalog = ServiceCatalog.from_file(self.path)
+        except Exception as e:
+            if self._catalog is None:
+                raise
+            # Missing (mid-rename) or mid-edit; keep serving the previous catalog and retry later
+            log.warning('catalog.invalid_file', kept=self._catalog.version, path=self.path, error=repr(e))
+            return
+        self._stat_key = stat_key
+        if self._catalog is None or catalog.version != self._catalog.version:
+            self._catalog = catalog
+            self.reload_count += 1
+
+
+def _subservices_ref(service, catalog):
+    """The reference for service['subServices'], or None if the list isn't exactly the catalog's"""
+    subservices = service.get('subServices')
+    catalog_subservices = catalog.subservices.get(service.get('id'))
+    if not subservices or not catalog_subservices or len(subservices) != len(catalog_subservices):
+        return None
+
+    excluded = []
+    for sub, (sub_id, name, _) in zip(subservices, catalog_subservices):
+        if (not isinstance(sub, dict) or sub.keys() != {'id', 'name', 'included'}
+                or sub['id'] != sub_id or sub['name'] != name or not isinstance(sub['included'], bool)):
+            return None
+        if not sub['included']:
+            excluded.append(sub_id)
+
+    ref = {'catalog': catalog.version}
+    if excluded:
+        ref['excluded'] = excluded
+    return ref
+
+
+def compact_subservices(sections, catalog):
+    """
+    Copy of stored headers / pricing breakdown sections where every service whose
+    subServices are the catalog's list is given a subServicesRef instead of the
+    full text. Anything else (custom or edited subservices) is kept as is.
+    """
+    if not isinstance(sections, list):
+        return sections
+
+    compacted = []
+    for section in sections:
+        services = section.get('services') if isinstance(section, dict) else None
+        if not isinstance(services, list):
+            compacted.append(section)
+            continue
+
+        compact_services = []
+        for service in services:
+            ref = _subservices_ref(service, catalog) if isinstance(service, dict) else None
+            if ref is None:
+                compact_services.append(service)
+            else:
+                # Same key position, so expanding gives back the original dict
+                compact_services.append({
+                    (SUBSERVICES_REF if key == 'subServices' else key): (ref if key == 'subServices' else value)
+                    for key, value in service.items()
+                })
+        compacted.append({**section, 'services': compact_services})
+    return compacted
+
+
+def expand_subservices(sections, catalog_for):
+    """
+    Inverse of compact_subservices. catalog_for(version) returns the
+    ServiceCatalog a reference was made against.
+    """
+    if not isinstance(sections, list):
+        return sections
+
+    expanded = []
+    for section in sections:
+        services = section.get('services') if isinstance(section, dict) else None
+        if not isinstance(services, list):
+            expanded.append(section)
+            continue
+
+        full_services = []
+        for service in services:
+            ref = service.get(SUBSERVICES_REF) if isinstance(service, dict) else None
+            if ref is None:
+                full_services.append(service)
+                continue
+
+            excluded = set(ref.get('excluded', ()))
+            subservices = [
+                {'id': sub_id, 'name': name, 'included': sub_id not in excluded}
+                for sub_id, name, _ in catalog_for(ref.get('catalog')).subservices.get(service.get('id'), ())
+            ]
+            full_services.append({
+                ('subServices' if key == SUBSERVICES_REF else key): (subservices if key == SUBSERVICES_REF else value)
+                for key, value in service.items()
+            })
+        expanded.append({**section, 'services': full_services})
+    return expanded
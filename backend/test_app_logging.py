@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Structured Logging Test
+Checks that disabled levels cost nothing (lazy fields are never evaluated), that records
+are written as JSON lines with their fields, and that sampled debug payloads are dropped
+"""
+
+import io
+import json
+import logging
+
+import app_logging
+from app_logging import JsonLinesFormatter, get_logger
+
+
+def _capture(name, level):
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonLinesFormatter())
+    logger = logging.getLogger(name)
+    logger.handlers[:] = [handler]
+    logger.propagate = False
+    logger.setLevel(level)
+    return stream
+
+
+def test_disabled_level_is_lazy():
+    stream = _capture('test.lazy', logging.INFO)
+    log = get_logger('test.lazy')
+    calls = []
+
+    log.debug('pricing.calculated', result=lambda: calls.append('built'))
+    assert calls == [] and stream.getvalue() == ''
+
+    log.info('pdf.request', args=lambda: calls.append('built') or {'summary': 'true'})
+    assert calls == ['built']
+    assert json.loads(stream.getvalue())['args'] == {'summary': 'true'}
+
+
+def test_json_lines():
+    stream = _capture('test.json', logging.DEBUG)
+    log = get_logger('test.json')
+
+    log.info('pdf.cache_hit', id='REQ 0001', key='abc')
+    try:
+        raise ValueError('boom')
+    except ValueError as e:
+        log.exception('pdf.generate_failed', error=str(e))
+
+    first, second = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert (first['level'], first['logger'], first['event']) == ('INFO', 'test.json', 'pdf.cache_hit')
+    assert (first['id'], first['key']) == ('REQ 0001', 'abc')
+    assert second['error'] == 'boom' and 'ValueError: boom' in second['exc']
+
+
+def test_sampled_debug_payloads():
+    stream = _capture('test.sample', logging.DEBUG)
+    log = get_logger('test.sample')
+    rate = app_logging._debug_sample_rate
+    try:
+        app_logging._debug_sample_rate = 0.0
+        log.debug('quotation.headers_processed', sample=True, original=lambda: 1 / 0)
+        log.debug('quotation.update', id='REQ 0001')
+        assert [json.loads(line)['event'] for line in stream.getvalue().splitlines()] == ['quotation.update']
+    finally:
+        app_logging._debug_sample_rate = rate
+
+
+if __name__ == "__main__":
+    test_disabled_level_is_lazy()
+    test_json_lines()
+    test_sampled_debug_payloads()
+    print("🎉 ALL STRUCTURED LOGGING TESTS PASSED!")
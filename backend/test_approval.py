@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Approval Engine Test
+Checks the approval reasons for package add-ons, customized headers, custom terms and
+discounts, and that decisions are cached per service selection / discount / threshold
+"""
+
+from approval import (APPROVAL_CUSTOM_TERMS, APPROVAL_CUSTOMIZED_HEADER, APPROVAL_DISCOUNT,
+                      APPROVAL_PACKAGE_ADDONS, ApprovalEngine, effective_discount)
+
+PACKAGE_CORE = {'header': 'Package A', 'services': [{'id': 'service-package-a-1'}, {'id': 'service-package-a-2'}]}
+PACKAGE_ADDON = {'header': 'Package B', 'services': [{'id': 'service-package-b-1'}, {'id': 'service-addon-3'}]}
+CUSTOMIZED = {'header': 'Customized Header', 'services': [{'id': 'service-compliance-1'}]}
+CUSTOMIZED_EMPTY = {'header': 'Customized Header', 'services': []}
+
+
+def _codes(decision):
+    return [reason.code for reason in decision.reasons]
+
+
+def test_reasons():
+    engine = ApprovalEngine()
+
+    decision = engine.evaluate([PACKAGE_CORE, CUSTOMIZED_EMPTY], threshold=10)
+    assert not decision.requires_approval and decision.reasons == ()
+
+    decision = engine.evaluate([PACKAGE_ADDON, CUSTOMIZED], discount_percent=15, custom_terms=['Net 30'], threshold=10)
+    assert decision.requires_approval
+    assert _codes(decision) == [APPROVAL_PACKAGE_ADDONS, APPROVAL_CUSTOMIZED_HEADER, APPROVAL_CUSTOM_TERMS, APPROVAL_DISCOUNT]
+    assert decision.reasons[0].service_ids == ('service-addon-3',)
+    assert decision.to_dict()['reasons'][0] == {
+        'code': APPROVAL_PACKAGE_ADDONS, 'message': "Package 'Package B' contains add-on services",
+        'header': 'Package B', 'serviceIds': ['service-addon-3']}
+
+    # Discount given as an amount: 100 off a 900 total is 10%, not above a 10% threshold
+    assert effective_discount(0, 100, 900) == 10
+    assert not engine.evaluate([], discount_amount=100, total_amount=900, threshold=10).requires_approval
+    assert _codes(engine.evaluate([], discount_amount=100, total_amount=900, threshold=5)) == [APPROVAL_DISCOUNT]
+
+
+def test_decisions_are_cached():
+    looked_up = []
+
+    def header_type(name):
+        looked_up.append(name)
+        return ('package' in name.lower(), 'customized' in name.lower())
+
+    engine = ApprovalEngine(header_type=header_type, max_size=2)
+    # Subservices and labels don't change the decision, so they don't change the key
+    with_details = {'header': 'Package B', 'services': [
+        dict(service, label='X', subServices=[{'id': 'sub-1'}]) for service in PACKAGE_ADDON['services']]}
+    # A different service selection does
+    fewer_services = {'header': 'Package B', 'services': [{'id': 'service-addon-3'}]}
+    first = engine.evaluate([PACKAGE_ADDON], threshold=10)
+    assert engine.evaluate([dict(PACKAGE_ADDON)], threshold=10) is first
+    assert engine.evaluate([with_details], threshold=10) is first
+    assert engine.evaluate([fewer_services], threshold=10) is not first
+    assert looked_up == ['Package B', 'Package B']
+    assert engine.stats()['hits'] == 2
+
+    engine.evaluate([PACKAGE_ADDON], threshold=20)
+    assert engine.stats()['entries'] == 2
+
+
+if __name__ == "__main__":
+    test_reasons()
+    test_decisions_are_cached()
+    print("🎉 ALL APPROVAL TESTS PASSED!")
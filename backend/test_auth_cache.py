@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Auth Cache Test
+Checks token -> user snapshot caching, expiry and invalidation of Authenticator
+"""
+
+import time
+from types import SimpleNamespace
+import jwt
+from auth import Authenticator, AuthError
+
+SECRET = 'test-secret-key-with-enough-length!'
+
+
+def _token(user_id, expires_in=3600):
+    return jwt.encode({'user_id': user_id, 'exp': int(time.time()) + expires_in}, SECRET, algorithm='HS256')
+
+
+def _authenticator(users, **kwargs):
+    loads = []
+
+    def load_user(user_id):
+        loads.append(user_id)
+        return users.get(user_id)
+
+    return Authenticator(lambda: SECRET, load_user, **kwargs), loads
+
+
+def test_cached_until_invalidated():
+    users = {1: SimpleNamespace(id=1, fname='A', lname='B', username='admin', role='admin', threshold=10)}
+    auth, loads = _authenticator(users)
+    token = _token(1)
+
+    assert auth.authenticate(token).role == 'admin'
+    assert auth.authenticate(token).role == 'admin'
+    assert loads == [1]
+
+    users[1].role = 'user'
+    auth.invalidate_user(1)
+    assert auth.authenticate(token).role == 'user'
+    assert loads == [1, 1]
+    assert auth.stats() == {'entries': 1, 'hits': 1, 'misses': 2}
+
+
+def test_errors_and_bounds():
+    users = {i: SimpleNamespace(id=i, fname=None, lname=None, username=f'u{i}', role='user', threshold=0)
+             for i in range(1, 4)}
+    auth, loads = _authenticator(users, ttl=0.05, max_size=2)
+
+    for token, message in [(None, 'Token missing'), ('garbage', 'Token invalid'),
+                           (_token(1, expires_in=-10), 'Token expired'), (_token(9), 'User not found')]:
+        try:
+            auth.authenticate(token)
+            assert False, message
+        except AuthError as e:
+            assert e.message == message and e.status == 401
+
+    tokens = [_token(i) for i in (1, 2, 3)]
+    for token in tokens:
+        auth.authenticate(token)
+    assert auth.stats()['entries'] == 2  # oldest entry evicted
+
+    time.sleep(0.06)
+    loads.clear()
+    auth.authenticate(tokens[2])
+    assert loads == [3]  # TTL expired
+
+
+if __name__ == "__main__":
+    test_cached_until_invalidated()
+    test_errors_and_bounds()
+    print("🎉 ALL AUTH CACHE TESTS PASSED!")
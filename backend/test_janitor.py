@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+File Janitor Test
+Checks the age, size and temp-file policies of FileJanitor and its wake-up on track()
+"""
+
+import os
+import tempfile
+import time
+from janitor import FileJanitor
+
+
+def _write(directory, name, size, age=0):
+    path = os.path.join(directory, name)
+    with open(path, 'wb') as f:
+        f.write(b'0' * size)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_age_and_tmp_policies():
+    with tempfile.TemporaryDirectory() as tmp:
+        _write(tmp, 'old.pdf', 10, age=7200)
+        _write(tmp, 'fresh.pdf', 10)
+        _write(tmp, 'tmp-abandoned.pdf', 10, age=3600)
+        _write(tmp, 'tmp-in-progress.pdf', 10)
+
+        metrics = FileJanitor([tmp], max_age=3600, tmp_grace=600).sweep()
+
+        assert sorted(os.listdir(tmp)) == ['fresh.pdf', 'tmp-in-progress.pdf']
+        assert metrics['files'] == 1
+        assert metrics['bytesOnDisk'] == 10
+        assert metrics['deletedFiles'] == 2
+
+
+def test_size_budget_evicts_oldest_first():
+    with tempfile.TemporaryDirectory() as tmp:
+        _write(tmp, 'a.pdf', 100, age=30)
+        _write(tmp, 'b.pdf', 100, age=20)
+        _write(tmp, 'c.pdf', 100, age=10)
+
+        metrics = FileJanitor([tmp], max_total_bytes=250).sweep()
+
+        assert sorted(os.listdir(tmp)) == ['b.pdf', 'c.pdf']
+        assert metrics['bytesOnDisk'] == 200
+
+
+def test_track_wakes_sweeper():
+    with tempfile.TemporaryDirectory() as tmp:
+        janitor = FileJanitor([tmp], max_total_bytes=150, interval=3600).start()
+        try:
+            # Wait for the initial sweep
+            while janitor.metrics()['lastSweepAt'] is None:
+                time.sleep(0.01)
+
+            _write(tmp, 'a.pdf', 100, age=10)
+            janitor.track(os.path.join(tmp, 'a.pdf'), 100)
+            path = _write(tmp, 'b.pdf', 100)
+            janitor.track(path, 100)
+
+            deadline = time.time() + 5
+            while os.path.exists(os.path.join(tmp, 'a.pdf')):
+                assert time.time() < deadline, janitor.metrics()
+                time.sleep(0.01)
+            assert os.listdir(tmp) == ['b.pdf']
+        finally:
+            janitor.stop()
+
+
+if __name__ == "__main__":
+    test_age_and_tmp_policies()
+    test_size_budget_evicts_oldest_first()
+    test_track_wakes_sweeper()
+    print("🎉 ALL JANITOR TESTS PASSED!")
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+PDF Asset Test
+Checks that the cover/appendix page PDFs are rendered and read once per image version, that a
+changed image replaces the old version, and that prepare_image downsamples oversized images to
+the print DPI, remembers when the original is already compact enough, and falls back to
+the original when it can't optimize
+"""
+
+import os
+import tempfile
+import time
+from PIL import Image
+import pdf_generator
+from image_assets import OPTIMIZED_DIR, prepare_image, target_size
+from pdf_generator import QuotationPDFGenerator
+
+
+def _generator(rendered):
+    # The static page helpers don't need wkhtmltopdf, so skip __init__
+    generator = object.__new__(QuotationPDFGenerator)
+
+    def image_to_pdf(images, pdf_path, optimize=True):
+        rendered.append(list(images))
+        QuotationPDFGenerator._image_to_pdf(images, pdf_path, optimize=False)
+
+    generator._image_to_pdf = image_to_pdf
+    return generator
+
+
+def _write_image(path, size, color):
+    Image.new('RGB', size, color).save(path)
+
+
+def test_static_pages_cache_hit():
+    with tempfile.TemporaryDirectory() as images_dir:
+        _write_image(os.path.join(images_dir, '1.png'), (60, 80), 'red')
+        rendered = []
+        generator = _generator(rendered)
+
+        path = generator._static_pages_pdf(images_dir, 'cover', ['1'])
+        assert generator._static_pages_pdf(images_dir, 'cover', ['1']) == path
+        assert len(rendered) == 1
+
+        data = generator._static_pages_bytes(path)
+        assert data.startswith(b'%PDF')
+        # Served from memory from now on
+        os.remove(path)
+        assert generator._static_pages_bytes(path) is data
+        pdf_generator._static_pages_data.pop(path, None)
+
+
+def test_changed_image_evicts_old_version():
+    with tempfile.TemporaryDirectory() as images_dir:
+        image = os.path.join(images_dir, '2.png')
+        _write_image(image, (60, 80), 'red')
+        rendered = []
+        generator = _generator(rendered)
+
+        old_path = generator._static_pages_pdf(images_dir, 'appendix', ['2', '3'])
+        generator._static_pages_bytes(old_path)
+
+        _write_image(image, (80, 60), 'blue')
+        os.utime(image, (time.time() + 5,) * 2)
+        new_path = generator._static_pages_pdf(images_dir, 'appendix', ['2', '3'])
+        generator._static_pages_bytes(new_path)
+
+        assert new_path != old_path and len(rendered) == 2
+        assert not os.path.exists(old_path)
+        assert old_path not in pdf_generator._static_pages_data
+        assert new_path in pdf_generator._static_pages_data
+        pdf_generator._static_pages_data.pop(new_path, None)
+
+
+def test_oversized_image_is_downsampled():
+    with tempfile.TemporaryDirectory() as images_dir:
+        image = os.path.join(images_dir, '4.png')
+        # Noise, so the optimized JPEG is actually smaller than the original
+        Image.effect_noise((1200, 1600), 64).convert('RGB').save(image)
+
+        optimized = prepare_image(image, dpi=50, quality=70)
+        assert optimized != image
+        assert os.path.dirname(optimized) == os.path.join(images_dir, OPTIMIZED_DIR)
+        width, height = target_size(50)
+        with Image.open(optimized) as im:
+            assert im.format == 'JPEG'
+            assert im.width <= width and im.height <= height
+            assert round(im.info['dpi'][0]) == 50
+        assert prepare_image(image, dpi=50, quality=70) == optimized
+
+
+def test_keeping_the_original_is_cached():
+    with tempfile.TemporaryDirectory() as images_dir:
+        image = os.path.join(images_dir, '6.png')
+        # A flat PNG is already smaller than any JPEG of it
+        _write_image(image, (40, 40), 'white')
+
+        assert prepare_image(image, dpi=50) == image
+        markers = os.listdir(os.path.join(images_dir, OPTIMIZED_DIR))
+        assert len(markers) == 1 and markers[0].endswith('.original')
+
+        # Decided once: later builds don't decode the image again
+        image_open = Image.open
+        Image.open = None
+        try:
+            assert prepare_image(image, dpi=50) == image
+        finally:
+            Image.open = image_open
+
+
+def test_falls_back_to_original():
+    with tempfile.TemporaryDirectory() as images_dir:
+        broken = os.path.join(images_dir, '5.jpg')
+        with open(broken, 'wb') as f:
+            f.write(b'not an image')
+
+        assert prepare_image(broken) == broken
+        assert prepare_image(os.path.join(images_dir, 'missing.jpg')) == os.path.join(images_dir, 'missing.jpg')
+        # No half-written copies are left behind
+        assert os.listdir(os.path.join(images_dir, OPTIMIZED_DIR)) == []
+
+
+if __name__ == "__main__":
+    test_static_pages_cache_hit()
+    test_changed_image_evicts_old_version()
+    test_oversized_image_is_downsampled()
+    test_keeping_the_original_is_cached()
+    test_falls_back_to_original()
+    print("🎉 ALL PDF ASSET TESTS PASSED!")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+PDF Render Cache Test
+Checks cache keys, hit/miss behaviour and size-bounded LRU eviction of PDFRenderCache
+"""
+
+import os
+import tempfile
+import time
+from pdf_cache import PDFRenderCache
+
+
+def _fake_pdf(size):
+    return b'%PDF-' + b'0' * (size - 5)
+
+
+def test_key_changes_with_content_and_assets():
+    with tempfile.TemporaryDirectory() as tmp:
+        images = os.path.join(tmp, 'images')
+        os.makedirs(images)
+        template = 'quotation_template.html'
+        cache = PDFRenderCache(os.path.join(tmp, 'cache'), asset_dirs=[images])
+
+        quotation = {'id': 'REQ 0001', 'totalAmount': 1000}
+        key = cache.key_for(quotation, template, 'bifurcated', 'v1')
+        assert key == cache.key_for(dict(quotation), template, 'bifurcated', 'v1')
+        assert key != cache.key_for({'id': 'REQ 0001', 'totalAmount': 2000}, template, 'bifurcated', 'v1')
+        assert key != cache.key_for(quotation, template, 'lumpsum', 'v1')
+        assert key != cache.key_for(quotation, template, 'bifurcated', 'v2')
+
+        open(os.path.join(images, '1.jpg'), 'wb').close()
+        assert key != cache.key_for(quotation, template, 'bifurcated', 'v1')
+
+
+def test_hit_after_put():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PDFRenderCache(tmp)
+        assert cache.get('abc') is None
+
+        path = cache.put('abc', _fake_pdf(100))
+        assert os.path.exists(path)
+        assert cache.get('abc') == path
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert [n for n in os.listdir(tmp) if n.startswith('tmp-')] == []
+
+
+def test_lru_eviction():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PDFRenderCache(tmp, max_bytes=250)
+        cache.put('a', _fake_pdf(100))
+        time.sleep(0.01)
+        cache.put('b', _fake_pdf(100))
+        time.sleep(0.01)
+        cache.get('a')  # 'a' is now more recent than 'b'
+        time.sleep(0.01)
+        cache.put('c', _fake_pdf(100))
+
+        assert cache.get('b') is None
+        assert cache.get('a') is not None
+        assert cache.get('c') is not None
+
+
+if __name__ == "__main__":
+    test_key_changes_with_content_and_assets()
+    test_hit_after_put()
+    test_lru_eviction()
+    print("🎉 ALL PDF CACHE TESTS PASSED!")
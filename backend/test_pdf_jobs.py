@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+PDF Job Manager Test
+Checks job status transitions, failures and expiry of PDFJobManager
+"""
+
+import threading
+import time
+from pdf_jobs import PDFJobManager, JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED
+
+
+def _wait(job, timeout=5):
+    deadline = time.time() + timeout
+    while job.status in (JOB_QUEUED, JOB_RUNNING):
+        assert time.time() < deadline, job.to_dict()
+        time.sleep(0.01)
+
+
+def test_job_lifecycle():
+    manager = PDFJobManager(max_workers=1)
+    release = threading.Event()
+
+    def render():
+        release.wait(5)
+        return '/tmp/Quotation_REQ 0001.pdf'
+
+    job = manager.submit('REQ 0001', 'Quotation_REQ 0001.pdf', render)
+    assert manager.get(job.id) is job
+    assert job.status in (JOB_QUEUED, JOB_RUNNING)
+
+    release.set()
+    _wait(job)
+    assert job.status == JOB_DONE
+    assert job.result == '/tmp/Quotation_REQ 0001.pdf'
+    assert job.to_dict()['jobId'] == job.id
+
+
+def test_failed_job():
+    manager = PDFJobManager(max_workers=1)
+
+    def render():
+        raise RuntimeError("wkhtmltopdf missing")
+
+    job = manager.submit('REQ 0002', 'Quotation_REQ 0002.pdf', render)
+    _wait(job)
+    assert job.status == JOB_FAILED
+    assert 'wkhtmltopdf missing' in job.error
+
+
+def test_finished_jobs_expire():
+    manager = PDFJobManager(max_workers=1, job_ttl=0)
+    job = manager.submit('REQ 0003', 'Quotation_REQ 0003.pdf', lambda: 'x.pdf')
+    _wait(job)
+    time.sleep(0.01)
+
+    # Dropped on the next lookup, without waiting for another submit
+    assert manager.get(job.id) is None
+    assert manager._jobs == {}
+
+
+if __name__ == "__main__":
+    test_job_lifecycle()
+    test_failed_job()
+    test_finished_jobs_expire()
+    print("🎉 ALL PDF JOB TESTS PASSED!")
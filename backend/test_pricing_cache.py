@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Pricing Cache Test
+Checks that PricingDataCache serves from memory and reloads only when pricing_data.json changes,
+and that PricingResultCache memoizes per pricing version
+"""
+
+import json
+import os
+import tempfile
+from pricing_cache import PricingDataCache, PricingResultCache
+from services_data import pricing_request_key
+
+
+def _write(path, rows):
+    with open(path, 'w') as f:
+        json.dump(rows, f)
+
+
+def test_reloads_only_on_change():
+    rows = [{'Developer Type ': 'Category 1', 'Project location ': 'ROM', 'Plot Area': '0-500', 'Service': 'Form 1', 'Amount': 1000}]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'pricing_data.json')
+        _write(path, rows)
+        cache = PricingDataCache(path, check_interval=0)
+
+        first = cache.get()
+        assert first.index.lookup('Category 1', 'ROM', '0-500', 'Form 1') == 1000
+        assert cache.get() is first
+        assert cache.reload_count == 1
+
+        # Same content with a new mtime keeps the same snapshot and version
+        os.utime(path, ns=(0, 0))
+        assert cache.get() is first
+
+        rows[0]['Amount'] = 2000
+        _write(path, rows)
+        os.utime(path, ns=(10**9, 10**9))
+        second = cache.get()
+        assert second.version != first.version
+        assert second.index.lookup('Category 1', 'ROM', '0-500', 'Form 1') == 2000
+        assert cache.reload_count == 2
+
+
+def test_keeps_previous_table_on_partial_write():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'pricing_data.json')
+        _write(path, [])
+        cache = PricingDataCache(path, check_interval=0)
+        first = cache.get()
+
+        with open(path, 'w') as f:
+            f.write('[{"Service": ')
+        assert cache.get() is first
+
+
+def test_missing_file():
+    cache = PricingDataCache('/nonexistent/pricing_data.json', check_interval=0)
+    snapshot = cache.get()
+    assert snapshot.data == []
+    assert snapshot.version is None
+
+
+def test_result_cache_per_version():
+    cache = PricingResultCache(max_size=2)
+    calls = []
+
+    def compute(value):
+        return lambda: calls.append(value) or {'value': value}
+
+    assert cache.get_or_compute('v1', 'a', compute(1)) == {'value': 1}
+    assert cache.get_or_compute('v1', 'a', compute(2)) == {'value': 1}
+    # A new pricing version drops everything computed from the old table
+    assert cache.get_or_compute('v2', 'a', compute(3)) == {'value': 3}
+    cache.get_or_compute('v2', 'b', compute(4))
+    cache.get_or_compute('v2', 'c', compute(5))
+    assert cache.stats()['entries'] == 2
+    assert calls == [1, 3, 4, 5]
+    assert cache.stats()['hitRate'] == 0.2
+
+
+def test_request_key_normalization():
+    service = {'id': 'service-project-registration-1', 'label': 'PROJECT REGISTRATION SERVICES', 'text': 'ignored'}
+    headers = [{'header': 'Project Registration', 'services': [service]}]
+    key = pricing_request_key('category 1', 'Pune - City', 300, headers)
+
+    # Same band, category spelling and irrelevant service fields -> same key
+    assert key == pricing_request_key('Category 1', 'Pune - City', 450, [{'header': 'Project Registration', 'services': [
+        {'id': 'service-project-registration-1', 'label': 'PROJECT REGISTRATION SERVICES'}]}])
+    assert key != pricing_request_key('category 1', 'Pune - City', 600, headers)
+    assert key != pricing_request_key('category 1', 'Pune - City', 300, [{'header': 'Project Registration', 'services': [
+        dict(service, quarterCount=2)]}])
+
+
+if __name__ == "__main__":
+    test_reloads_only_on_change()
+    test_keeps_previous_table_on_partial_write()
+    test_missing_file()
+    test_result_cache_per_version()
+    test_request_key_normalization()
+    print("🎉 ALL PRICING CACHE TESTS PASSED!")
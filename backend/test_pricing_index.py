@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Pricing Index Test
+Checks that the compiled PricingIndex returns the same prices as a plain scan of pricing_data.json,
+and that batch pricing matches single calculations
+"""
+
+import json
+import os
+from services_data import ServicesDataManager, PricingIndex, DEFAULT_SERVICE_PRICE
+
+PRICING_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pricing_data.json')
+
+
+def load_pricing_data():
+    with open(PRICING_FILE, 'r') as f:
+        return json.load(f)
+
+
+def test_exact_lookup_matches_rows():
+    """Every row in the JSON should be found through the exact index"""
+    pricing_data = load_pricing_data()
+    pricing_index = PricingIndex(pricing_data)
+
+    seen = set()
+    for item in pricing_data:
+        key = (item.get('Developer Type '), item.get('Project location '), item.get('Plot Area'), item.get('Service', '').strip())
+        # Only the first row for a key is indexed, same as the old linear scan
+        if not all(key) or key in seen:
+            continue
+        seen.add(key)
+        amount = item.get('Amount')
+        expected = 0 if amount == '-' else float(amount)
+        assert pricing_index.exact[key] == expected
+
+
+def test_relaxed_fallback_and_default():
+    """Unknown regions fall back to any region for the service, unknown services to the default"""
+    pricing_data = [
+        {'Developer Type ': 'Category 1', 'Project location ': 'ROM', 'Plot Area': '0-500', 'Service': 'Form 1 ', 'Amount': '-'},
+        {'Developer Type ': 'Category 1', 'Project location ': 'ROM', 'Plot Area': '500-2000', 'Service': 'Form 1', 'Amount': 'n/a'},
+        {'Developer Type ': 'Category 1', 'Project location ': 'Pune', 'Plot Area': '0-500', 'Service': 'Form 2 ', 'Amount': '1,500'},
+    ]
+    manager = ServicesDataManager()
+
+    assert manager._find_pricing_from_array('category 1', 'ROM', 100, 'Form 1', pricing_data) == 0
+    # Unparseable amount on an exact match keeps the historical default
+    assert manager._find_pricing_from_array('category 1', 'ROM', 1000, 'Form 1', pricing_data) == DEFAULT_SERVICE_PRICE
+    # Relaxed match ignores region and band
+    assert manager._find_pricing_from_array('category 1', 'Raigad', 9000, 'Engineer\'s Certificate as per Form 2', pricing_data) == 1500
+    assert manager._find_pricing_from_array('category 1', 'ROM', 100, 'Unknown Service', pricing_data) == DEFAULT_SERVICE_PRICE
+
+
+def test_index_is_built_once():
+    """The manager should reuse the compiled index for the same pricing data"""
+    pricing_data = load_pricing_data()
+    manager = ServicesDataManager()
+
+    first = manager.get_pricing_index(pricing_data)
+    manager.calculate_enhanced_pricing('category 1', 'Mumbai City', 300, [{'header': 'Package A', 'services': []}], pricing_data)
+    assert manager.get_pricing_index(pricing_data) is first
+    assert manager.get_pricing_index(first) is first
+
+
+def test_batch_matches_single_calculations():
+    """Batch results line up with their scenarios and equal one-by-one calculations"""
+    pricing_index = PricingIndex(load_pricing_data())
+    manager = ServicesDataManager()
+    headers = [{'header': 'Project Registration', 'services': [
+        {'id': 'service-project-registration-1', 'label': 'PROJECT REGISTRATION SERVICES'}]}]
+    scenarios = [{'developerType': 'category 1', 'projectRegion': region, 'plotArea': area, 'headers': headers}
+                 for region in ('Mumbai City', 'Pune - City') for area in (300, 3000)]
+
+    results = manager.calculate_pricing_batch(scenarios + [scenarios[0], {'developerType': 'category 1'}], pricing_index)
+
+    for scenario, result in zip(scenarios, results):
+        assert result == manager.calculate_enhanced_pricing(
+            'category 1', scenario['projectRegion'], scenario['plotArea'], headers, pricing_index)
+    assert results[4] is results[0]  # duplicate scenario computed once
+    assert results[5] == {'success': False, 'error': "Missing field 'projectRegion'"}
+
+
+def test_batch_isolates_malformed_headers():
+    """A scenario whose headers aren't header objects fails alone"""
+    pricing_index = PricingIndex(load_pricing_data())
+    manager = ServicesDataManager()
+    valid = {'developerType': 'category 1', 'projectRegion': 'Mumbai City', 'plotArea': 300,
+             'headers': [{'header': 'Package A', 'services': []}]}
+    malformed = [dict(valid, headers=['x']), dict(valid, headers=[{'services': ['a']}]), dict(valid, headers='x')]
+
+    results = manager.calculate_pricing_batch([valid] + malformed + [valid], pricing_index)
+
+    assert results[0] == manager.calculate_enhanced_pricing('category 1', 'Mumbai City', 300, valid['headers'], pricing_index)
+    assert results[4] is results[0]
+    for result in results[1:4]:
+        assert result['success'] is False and result['error'].startswith('Invalid scenario')
+
+
+if __name__ == "__main__":
+    test_exact_lookup_matches_rows()
+    test_relaxed_fallback_and_default()
+    test_index_is_built_once()
+    test_batch_matches_single_calculations()
+    test_batch_isolates_malformed_headers()
+    print("🎉 ALL PRICING INDEX TESTS PASSED!")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Quotation Patch Test
+Checks JSON Patch application to quotation sections: touched-only processing,
+header total recomputation, test operations and rejection of unsupported paths
+"""
+
+from quotation_patch import PatchConflict, PatchError, QuotationPatch
+
+
+def _breakdown():
+    return [
+        {'header': 'Compliance', 'headerTotal': 300.0, 'services': [
+            {'id': 's-1', 'totalAmount': 100.0, 'finalAmount': 100.0},
+            {'id': 's-2', 'totalAmount': 200.0, 'finalAmount': 200.0},
+        ]},
+        {'header': 'Add ons', 'headerTotal': 50.0, 'services': [{'id': 's-3', 'totalAmount': 50.0}]},
+    ]
+
+
+def _patch(breakdown=None, headers=None, expanded=None):
+    expanded = [] if expanded is None else expanded
+
+    def expand(section):
+        expanded.append(section['header'])
+        return section
+
+    return QuotationPatch({'headers': headers or [], 'pricingBreakdown': breakdown or _breakdown()},
+                          {'totalAmount': 350.0}, expand)
+
+
+def test_price_edit_recomputes_only_touched_section():
+    breakdown, expanded = _breakdown(), []
+    patch = _patch(breakdown, expanded=expanded)
+    patch.apply([
+        {'op': 'replace', 'path': '/pricingBreakdown/0/services/1/finalAmount', 'value': 150},
+        {'op': 'replace', 'path': '/totalAmount', 'value': '300'},
+    ])
+    patch.finish(lambda header: header)
+
+    assert expanded == ['Compliance']
+    assert patch.sections['pricingBreakdown'][0]['headerTotal'] == 250.0
+    assert patch.sections['pricingBreakdown'][1] is breakdown[1]
+    assert patch.touched_indexes('pricingBreakdown') == [0]
+    assert patch.scalars['totalAmount'] == 300.0
+    assert patch.changed == {'pricingBreakdown', 'totalAmount'}
+    # The stored sections themselves are never modified
+    assert breakdown[0]['services'][1]['finalAmount'] == 200.0
+
+
+def test_added_header_is_processed_alone():
+    processed = []
+
+    def process(header):
+        processed.append(header['header'])
+        return dict(header, name=header['header'])
+
+    patch = _patch(headers=[{'header': 'Package A', 'services': []}])
+    patch.apply([{'op': 'add', 'path': '/headers/-', 'value': {'header': 'Compliance', 'services': []}}])
+    patch.finish(process)
+
+    assert processed == ['Compliance']
+    assert patch.touched_indexes('headers') == [1]
+    assert patch.sections['headers'][1]['name'] == 'Compliance'
+
+
+def test_failing_test_and_unsupported_paths():
+    patch = _patch()
+    try:
+        patch.apply([{'op': 'test', 'path': '/pricingBreakdown/0/services/0/id', 'value': 's-9'}])
+        assert False, "test operation should have failed"
+    except PatchConflict:
+        pass
+
+    for operation in ({'op': 'replace', 'path': '/status', 'value': 'completed'},
+                      {'op': 'replace', 'path': '/pricingBreakdown', 'value': []},
+                      {'op': 'remove', 'path': '/pricingBreakdown/5'},
+                      {'op': 'move', 'path': '/totalAmount'},
+                      {'op': 'add', 'path': '/pricingBreakdown/0/services/-'}):
+        try:
+            _patch().apply([operation])
+            assert False, f"{operation} should have been rejected"
+        except PatchError:
+            pass
+
+
+if __name__ == "__main__":
+    test_price_edit_recomputes_only_touched_section()
+    test_added_header_is_processed_alone()
+    test_failing_test_and_unsupported_paths()
+    print("🎉 ALL QUOTATION PATCH TESTS PASSED!")
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Quotation Sequence Test
+Checks that quotation numbers come from the counter table and are released on rollback
+"""
+
+from database import use_scratch_database
+use_scratch_database()  # before importing app, which creates its tables on import
+
+from app import app, db, Counter, QUOTATION_COUNTER, allocate_quotation_number, seed_quotation_sequence
+
+
+def test_allocation_is_sequential_and_transactional():
+    with app.app_context():
+        start = seed_quotation_sequence()
+
+        first = allocate_quotation_number()
+        second = allocate_quotation_number()
+        assert (first, second) == (start + 1, start + 2)
+
+        # Nothing was committed, so the numbers are handed out again
+        db.session.rollback()
+        assert db.session.get(Counter, QUOTATION_COUNTER).value == start
+
+
+if __name__ == "__main__":
+    test_allocation_is_sequential_and_transactional()
+    print("🎉 ALL QUOTATION SEQUENCE TESTS PASSED!")
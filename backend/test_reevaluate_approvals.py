@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Approval Re-evaluation Test
+Checks which draft / pending quotations reevaluate_approvals moves, in a dry run and written in batches,
+and that rows changed by someone else in between are counted as conflicts instead of overwritten
+"""
+
+from database import use_scratch_database
+use_scratch_database()  # before importing app, which creates its tables on import
+
+from app import app, db, User, Quotation, approval_engine, reevaluate_approvals
+
+
+def test_dry_run_counts():
+    with app.app_context():
+        try:
+            db.session.add(User(username='reeval-user', fname='Re', lname='Eval', role='user',
+                                threshold=5, password_hash='-'))
+            rows = [
+                # (status, requires_approval, discount %, creator)
+                ('draft', False, 10, 'Re Eval'),            # over the 5% threshold -> pending
+                ('draft', False, 2, 'Re Eval'),             # fine
+                ('pending_approval', True, 1, 'reeval-user'),  # no longer needs approval -> draft
+                ('pending_approval', True, 1, 'Nobody'),    # unknown creator, skipped
+                ('completed', False, 50, 'Re Eval'),        # finished quotations are left alone
+            ]
+            for i, (status, requires_approval, discount, creator) in enumerate(rows):
+                db.session.add(Quotation(
+                    id=f'REEVAL {i}', developer_type='cat1', project_region='Pune', plot_area=1,
+                    developer_name='Test', status=status, requires_approval=requires_approval,
+                    discount_percent=discount, created_by=creator, headers=[], custom_terms=[]
+                ))
+            db.session.flush()
+
+            result = reevaluate_approvals(dry_run=True)
+            assert result['toPending'] >= 1 and result['toDraft'] >= 1
+
+            result = reevaluate_approvals(username='reeval-user', dry_run=True)
+            assert (result['scanned'], result['toPending'], result['toDraft'], result['unchanged']) == (3, 1, 1, 1)
+            assert result['unknownCreator'] == 0
+        finally:
+            db.session.rollback()
+
+
+def test_shared_display_name_is_not_guessed():
+    with app.app_context():
+        try:
+            # Two users called "Same Name" with different thresholds: 10% is fine for one, not the other
+            db.session.add_all([
+                User(username='same-1', fname='Same', lname='Name', role='user', threshold=5, password_hash='-'),
+                User(username='same-2', fname='Same', lname='Name', role='user', threshold=20, password_hash='-'),
+            ])
+            db.session.add(Quotation(
+                id='REEVAL SAME', developer_type='cat1', project_region='Pune', plot_area=1, developer_name='Test',
+                status='draft', discount_percent=10, created_by='Same Name', headers=[], custom_terms=[]))
+            db.session.flush()
+
+            result = reevaluate_approvals(username='same-2', dry_run=True)
+            assert (result['scanned'], result['ambiguousCreator'], result['toPending']) == (1, 1, 0)
+        finally:
+            db.session.rollback()
+
+
+def test_writes_and_conflicts():
+    ids = ['REEVAL W0', 'REEVAL W1', 'REEVAL W2']
+    with app.app_context():
+        try:
+            db.session.add(User(username='reeval-writer', fname='Re', lname='Writer', role='user',
+                                threshold=5, password_hash='-'))
+            for quotation_id, status, discount in zip(ids, ('draft', 'pending_approval', 'draft'), (10, 1, 20)):
+                db.session.add(Quotation(
+                    id=quotation_id, developer_type='cat1', project_region='Pune', plot_area=1,
+                    developer_name='Test', status=status, requires_approval=status == 'pending_approval',
+                    discount_percent=discount, created_by='Re Writer', headers=[], custom_terms=[]
+                ))
+            db.session.commit()
+
+            evaluate = approval_engine.evaluate
+
+            def evaluate_while_completed_elsewhere(*args, **kwargs):
+                # Another request completes W2 after its chunk was read but before it is written
+                del approval_engine.evaluate
+                with db.engine.begin() as connection:
+                    connection.execute(Quotation.__table__.update()
+                                       .where(Quotation.id == 'REEVAL W2').values(status='completed'))
+                return evaluate(*args, **kwargs)
+
+            approval_engine.evaluate = evaluate_while_completed_elsewhere
+            result = reevaluate_approvals(username='reeval-writer', chunk_size=1000)
+            assert (result['toPending'], result['toDraft'], result['conflicts']) == (2, 1, 1)
+            assert not result['dryRun']
+
+            db.session.expire_all()
+            stored = {q.id: (q.status, q.requires_approval) for q in Quotation.query.filter(Quotation.id.in_(ids))}
+            assert stored == {'REEVAL W0': ('pending_approval', True),
+                              'REEVAL W1': ('draft', False),
+                              'REEVAL W2': ('completed', False)}
+
+            # Nothing left to move, and the rows moved to pending are not read a second time
+            result = reevaluate_approvals(username='reeval-writer')
+            assert (result['scanned'], result['unchanged'], result['conflicts']) == (2, 2, 0)
+        finally:
+            approval_engine.__dict__.pop('evaluate', None)
+            db.session.rollback()
+            Quotation.query.filter(Quotation.id.in_(ids)).delete(synchronize_session=False)
+            User.query.filter_by(username='reeval-writer').delete()
+            db.session.commit()
+
+
+if __name__ == "__main__":
+    test_dry_run_counts()
+    test_shared_display_name_is_not_guessed()
+    test_writes_and_conflicts()
+    print("🎉 ALL APPROVAL RE-EVALUATION TESTS PASSED!")
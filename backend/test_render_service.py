@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Render Service Test
+Runs RenderService against a stand-in wkhtmltopdf script to check output, timeouts and queue limits
+"""
+
+import os
+import stat
+import sys
+import tempfile
+import threading
+import time
+import pdfkit
+from render_service import RenderService, RenderTimeout, RenderQueueFull
+
+FAKE_WKHTMLTOPDF = '''#!{python}
+import sys, time
+html = sys.stdin.read()
+if "sleep" in html:
+    time.sleep(float(html.split()[-1]))
+pdf = b"%PDF-1.4 fake " + html.encode()
+out = sys.argv[-1]
+if out == "-":
+    sys.stdout.buffer.write(pdf)
+else:
+    open(out, "wb").write(pdf)
+'''
+
+
+def _make_config(tmp):
+    path = os.path.join(tmp, 'wkhtmltopdf')
+    with open(path, 'w') as f:
+        f.write(FAKE_WKHTMLTOPDF.format(python=sys.executable))
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    return pdfkit.configuration(wkhtmltopdf=path)
+
+
+def test_render_to_bytes_and_file():
+    with tempfile.TemporaryDirectory() as tmp:
+        config = _make_config(tmp)
+        service = RenderService(max_workers=1)
+
+        assert service.render('<p>hi</p>', None, config, {'quiet': ''}).startswith(b'%PDF')
+
+        out = os.path.join(tmp, 'out.pdf')
+        assert service.render('<p>hi</p>', out, config, {'quiet': ''}) == out
+        assert open(out, 'rb').read().startswith(b'%PDF')
+        assert service.stats()['completed'] == 2
+
+
+def test_job_timeout():
+    with tempfile.TemporaryDirectory() as tmp:
+        config = _make_config(tmp)
+        service = RenderService(max_workers=1, job_timeout=0.5)
+        try:
+            service.render('sleep 5', None, config, {})
+            assert False, "expected RenderTimeout"
+        except RenderTimeout:
+            pass
+        assert service.stats()['failed'] == 1
+
+
+def test_queue_limit():
+    with tempfile.TemporaryDirectory() as tmp:
+        config = _make_config(tmp)
+        service = RenderService(max_workers=1, max_queue=1)
+
+        def wait_for(active, queued):
+            deadline = time.time() + 5
+            while (service.stats()['active'], service.stats()['queued']) != (active, queued):
+                assert time.time() < deadline, service.stats()
+                time.sleep(0.01)
+
+        # One job running, one waiting for the worker
+        threads = [threading.Thread(target=service.render, args=('sleep 1', None, config, {})) for _ in range(2)]
+        threads[0].start()
+        wait_for(1, 0)
+        threads[1].start()
+        wait_for(1, 1)
+
+        try:
+            service.render('<p>hi</p>', None, config, {})
+            assert False, "expected RenderQueueFull"
+        except RenderQueueFull:
+            pass
+
+        for t in threads:
+            t.join()
+        assert service.stats()['completed'] == 2
+
+
+if __name__ == "__main__":
+    test_render_to_bytes_and_file()
+    test_job_timeout()
+    test_queue_limit()
+    print("🎉 ALL RENDER SERVICE TESTS PASSED!")
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Services Catalog Test
+Checks the compiled header classification, package tables and service flags of ServicesDataManager,
+the loading, validation and reload of services_catalog.json, the compact stored subservice form
+and storing catalog snapshots that another worker already stored
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from service_catalog import (CATALOG_FILE, SUBSERVICES_REF, CatalogError, CatalogLoader, ServiceCatalog,
+                             compact_subservices, expand_subservices)
+from services_data import ServicesDataManager, SERVICE_NAME_MAPPING
+
+
+def test_header_classification():
+    manager = ServicesDataManager()
+    assert manager.header_type('Package A') == (True, False)
+    assert manager.header_type('My package c plan') == (True, False)
+    assert manager.header_type('Customized Header') == (False, True)
+    assert manager.header_type('Customized Package B') == (True, True)
+    assert manager.header_type('Compliance') == (False, False)
+    assert manager.header_type('') == (False, False)
+    assert manager.header_type(None) == (False, False)
+    assert manager.is_package_header('PACKAGE D') and not manager.is_customized_header('PACKAGE D')
+
+
+def test_compiled_tables():
+    manager = ServicesDataManager()
+    assert manager.get_package_service_ids('Package B')[-1] == 'service-package-b-1'
+    assert manager.get_package_service_ids('package a') == manager.get_package_service_ids('Package B')[:4]
+    assert manager.get_package_service_ids('Package E') == ()
+    assert manager.service_flags('service-addon-7') == (False, True)
+    assert manager.service_flags('unknown') == (False, False)
+    assert manager._map_service_name('LIAISONING') == SERVICE_NAME_MAPPING['LIAISONING']
+    assert manager._map_service_name('Unmapped') == 'Unmapped'
+
+
+def test_results_do_not_share_catalog_state():
+    """Callers store and edit returned subservices; that must not leak into the catalog"""
+    manager = ServicesDataManager()
+    services = manager.get_services_for_package('Package A')
+    services[0]['subServices'][0]['included'] = False
+    services[0]['subServices'].clear()
+    again = manager.get_services_for_package('Package A')
+    assert again[0]['subServices'] and again[0]['subServices'][0]['included'] is True
+
+
+def test_duplicate_addons_added_once():
+    manager = ServicesDataManager()
+    addon = {'id': 'service-addon-1', 'label': 'LIAISONING'}
+    processed = manager.process_headers_with_subservices([
+        {'header': 'Package A', 'services': [addon, dict(addon), {'id': 'service-package-a-1'}]}
+    ])
+    ids = [service['id'] for service in processed[0]['services']]
+    assert ids == list(manager.get_package_service_ids('Package A')) + ['service-addon-1']
+
+
+def test_catalog_file_validation():
+    with open(CATALOG_FILE, 'rb') as f:
+        raw = f.read()
+    catalog = ServiceCatalog(raw)
+    assert catalog.version == ServiceCatalog(raw).version
+    assert json.loads(catalog.response_body)['version'] == catalog.version
+
+    data = json.loads(raw)
+    data['packages']['package a'].append('service-missing')
+    try:
+        ServiceCatalog(json.dumps(data).encode())
+        assert False, "unknown package service accepted"
+    except CatalogError as e:
+        assert 'service-missing' in str(e)
+
+    data = json.loads(raw)
+    service_id, service = next((service_id, service) for service_id, service in data['services'].items()
+                               if service.get('subServices'))
+    for name in (None, 7, ' '):
+        service['subServices'][0]['name'] = name
+        try:
+            ServiceCatalog(json.dumps(data).encode())
+            assert False, f"subservice name {name!r} accepted"
+        except CatalogError as e:
+            assert service_id in str(e)
+    del service['subServices'][0]['name']
+    try:
+        ServiceCatalog(json.dumps(data).encode())
+        assert False, "subservice without a name accepted"
+    except CatalogError:
+        pass
+
+
+def test_loader_reloads_and_keeps_last_good_catalog():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'catalog.json')
+        shutil.copy(CATALOG_FILE, path)
+        loader = CatalogLoader(path, check_interval=0)
+        manager = ServicesDataManager(loader)
+        version = manager.catalog_version
+
+        with open(path) as f:
+            data = json.load(f)
+        data['services']['service-addon-7']['requiresYearOnly'] = False
+        with open(path, 'w') as f:
+            json.dump(data, f)
+        assert manager.catalog_version != version
+        assert manager.service_flags('service-addon-7') == (False, False)
+
+        with open(path, 'w') as f:
+            f.write('{"schemaVersion": 1, "services": ')
+        assert manager.service_flags('service-addon-7') == (False, False)
+        assert loader.reload_count == 2
+
+        # A subservice without a usable name, and the file missing mid-rename
+        service = next(service for service in data['services'].values() if service.get('subServices'))
+        service['subServices'][0]['name'] = None
+        with open(path, 'w') as f:
+            json.dump(data, f)
+        assert manager.service_flags('service-addon-7') == (False, False)
+        os.remove(path)
+        assert manager.catalog_version == loader.get().version
+        assert loader.reload_count == 2
+
+
+def test_compact_subservices_round_trip():
+    manager = ServicesDataManager()
+    catalog = manager.catalog
+    headers = manager.process_headers_with_subservices([
+        {'header': 'Package B', 'services': [{'id': 'service-addon-7', 'label': 'X', 'selectedYears': [2024]}]},
+        {'header': 'Customized Header', 'services': [
+            {'id': 'custom-1', 'label': 'Custom', 'subServices': [{'id': 'c-1', 'name': 'Custom text'}]}]},
+    ])
+    headers[0]['services'][1]['subServices'][1]['included'] = False
+    headers[1]['services'][0]['subServices'] = [{'id': 'c-1', 'name': 'Custom text', 'included': True}]
+
+    compacted = compact_subservices(headers, catalog)
+    first = compacted[0]['services'][0]
+    assert 'subServices' not in first and first[SUBSERVICES_REF] == {'catalog': catalog.version}
+    assert compacted[0]['services'][1][SUBSERVICES_REF]['excluded'] == [headers[0]['services'][1]['subServices'][1]['id']]
+    assert compacted[1] == headers[1]  # not catalog text - stored as is
+    assert len(json.dumps(compacted)) < len(json.dumps(headers)) / 3
+
+    expanded = expand_subservices(compacted, lambda version: catalog)
+    assert json.dumps(expanded) == json.dumps(headers)
+
+
+def test_snapshot_stored_by_another_worker():
+    from database import use_scratch_database
+    use_scratch_database()
+    import app as app_module
+    from app import app, db, CatalogSnapshot, Quotation, allocate_quotation_number, stored_catalog_versions
+
+    with app.app_context():
+        raw = json.loads(app_module.get_service_catalog().content)
+        raw['packages'] = dict(raw['packages'], **{'Package Y': []})
+        stored_here = ServiceCatalog(json.dumps(raw).encode('utf-8'))
+        raw['packages']['Package Z'] = []
+        catalog = ServiceCatalog(json.dumps(raw).encode('utf-8'))
+
+        # Stored in its own transaction, and remembered as stored
+        app_module.remember_catalog(stored_here)
+        assert stored_here.version in stored_catalog_versions
+        assert db.session.get(CatalogSnapshot, stored_here.version) is not None
+
+        # Another worker picked up the next catalog and stored its snapshot first
+        with db.engine.begin() as connection:
+            connection.execute(CatalogSnapshot.__table__.insert().values(version=catalog.version,
+                                                                         content=catalog.content))
+        get_service_catalog = app_module.get_service_catalog
+        app_module.get_service_catalog = lambda: catalog
+        try:
+            app_module.remember_catalog(catalog)
+            assert catalog.version in stored_catalog_versions
+
+            # The catalog changes mid-request: the snapshot goes into the quotation's own transaction
+            stored_catalog_versions.discard(catalog.version)
+            quotation_id = f"REQ {allocate_quotation_number():04d}"
+            db.session.add(Quotation(id=quotation_id, developer_type='cat1', project_region='Pune', plot_area=1,
+                                     developer_name='Test', headers=[], custom_terms=[]))
+            db.session.commit()
+            assert db.session.get(CatalogSnapshot, catalog.version).content == catalog.content
+        finally:
+            app_module.get_service_catalog = get_service_catalog
+            db.session.rollback()
+
+
+if __name__ == "__main__":
+    test_header_classification()
+    test_compiled_tables()
+    test_results_do_not_share_catalog_state()
+    test_duplicate_addons_added_once()
+    test_catalog_file_validation()
+    test_loader_reloads_and_keeps_last_good_catalog()
+    test_compact_subservices_round_trip()
+    test_snapshot_stored_by_another_worker()
+    print("🎉 ALL SERVICES CATALOG TESTS PASSED!")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Template Registry Test
+Checks that PDF templates are compiled once per process and cached as bytecode
+"""
+
+import os
+import tempfile
+import pdf_generator
+from pdf_generator import TEMPLATE_CACHE_DIR, get_template_environment, template_auto_reload, template_version
+
+
+def test_environment_is_shared_and_cached():
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, 'page.html'), 'w') as f:
+            f.write('Hello {{ name }}')
+
+        env = get_template_environment(tmp, auto_reload=False)
+        assert get_template_environment(tmp, auto_reload=False) is env
+
+        template = env.get_template('page.html')
+        assert template.render(name='RERA') == 'Hello RERA'
+        assert env.get_template('page.html') is template
+        assert os.listdir(os.path.join(tmp, TEMPLATE_CACHE_DIR))
+
+
+def test_auto_reload_only_when_enabled():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'page.html')
+        with open(path, 'w') as f:
+            f.write('v1')
+        static_env = get_template_environment(tmp, auto_reload=False)
+        debug_env = get_template_environment(tmp, auto_reload=True)
+        assert static_env.get_template('page.html').render() == 'v1'
+        assert debug_env.get_template('page.html').render() == 'v1'
+
+        with open(path, 'w') as f:
+            f.write('v2')
+        os.utime(path, (os.path.getmtime(path) + 5,) * 2)
+
+        assert static_env.get_template('page.html').render() == 'v1'
+        assert debug_env.get_template('page.html').render() == 'v2'
+
+
+def test_version_follows_the_compiled_template():
+    auto_reload = pdf_generator._auto_reload
+    try:
+        for enabled in (False, True):
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, 'page.html')
+                with open(path, 'w') as f:
+                    f.write('v1')
+                pdf_generator.set_template_auto_reload(enabled)
+                version = template_version('page.html', tmp)
+
+                with open(path, 'w') as f:
+                    f.write('v2')
+                os.utime(path, (os.path.getmtime(path) + 5,) * 2)
+
+                # Without auto-reload the old compiled template keeps rendering, and keeps its version
+                assert (template_version('page.html', tmp) != version) == enabled
+                rendered = get_template_environment(tmp).get_template('page.html').render()
+                assert rendered == ('v2' if enabled else 'v1')
+    finally:
+        pdf_generator.set_template_auto_reload(auto_reload)
+
+
+def test_auto_reload_setting():
+    saved = {name: os.environ.pop(name, None) for name in ('PDF_TEMPLATE_AUTO_RELOAD', 'FLASK_DEBUG')}
+    try:
+        assert not template_auto_reload() and template_auto_reload(debug=True)
+        os.environ['FLASK_DEBUG'] = '1'
+        assert template_auto_reload() and not template_auto_reload(debug=False)
+        os.environ['PDF_TEMPLATE_AUTO_RELOAD'] = 'false'
+        assert not template_auto_reload(debug=True)
+    finally:
+        for name, value in saved.items():
+            os.environ.pop(name, None)
+            if value is not None:
+                os.environ[name] = value
+
+
+if __name__ == "__main__":
+    test_environment_is_shared_and_cached()
+    test_auto_reload_only_when_enabled()
+    test_version_follows_the_compiled_template()
+    test_auto_reload_setting()
+    print("🎉 ALL TEMPLATE REGISTRY TESTS PASSED!")
@@ -7,7 +7,7 @@ Tests all possible combinations from pricing_data.json to ensure correct pricing
 import json
 import sys
 from collections import defaultdict
-from services_data import ServicesDataManager
+from services_data import ServicesDataManager, PricingIndex
 
 def load_pricing_data():
     """Load the pricing data from JSON file"""
@@ -51,7 +51,7 @@ def get_plot_area_numeric_value(plot_area_band):
     }
     return band_mapping.get(plot_area_band, 250)
 
-def test_pricing_lookup(services_manager, category, location, plot_area_band, service_name, expected_amount, pricing_data):
+def test_pricing_lookup(services_manager, category, location, plot_area_band, service_name, expected_amount, pricing_index):
     """Test a single pricing lookup"""
     plot_area_numeric = get_plot_area_numeric_value(plot_area_band)
     
@@ -60,7 +60,7 @@ def test_pricing_lookup(services_manager, category, location, plot_area_band, se
     
     try:
         result = services_manager._find_pricing_from_array(
-            test_category, location, plot_area_numeric, service_name, pricing_data
+            test_category, location, plot_area_numeric, service_name, pricing_index
         )
         
         # Handle special cases for expected amount
@@ -105,8 +105,9 @@ def main():
     # Load data and initialize manager
     pricing_data = load_pricing_data()
     services_manager = ServicesDataManager()
+    pricing_index = PricingIndex(pricing_data)
     
-    print(f"✅ Loaded {len(pricing_data)} pricing entries")
+    print(f"✅ Loaded {len(pricing_data)} pricing entries ({len(pricing_index)} indexed)")
     
     # Extract unique values
     categories, locations, plot_areas, services = extract_unique_values(pricing_data)
@@ -138,7 +139,7 @@ def main():
             continue
             
         result = test_pricing_lookup(
-            services_manager, category, location, plot_area, service, amount, pricing_data
+            services_manager, category, location, plot_area, service, amount, pricing_index
         )
         results.append(result)
         
@@ -142,9 +142,12 @@ def update_pricing_files():
                 json.dump(pricing_data, f, indent=2, ensure_ascii=False)
             print(f"Updated frontend pricing file: {frontend_json}")
             
-            # Update backend file
-            with open(backend_json, 'w', encoding='utf-8') as f:
+            # Update backend file atomically so the running server's pricing cache
+            # never picks up a half-written file
+            backend_tmp = backend_json.with_suffix(".json.tmp")
+            with open(backend_tmp, 'w', encoding='utf-8') as f:
                 json.dump(pricing_data, f, indent=2, ensure_ascii=False)
+            os.replace(backend_tmp, backend_json)
             print(f"Updated backend pricing file: {backend_json}")
             
             # Remove temp file